@@ -1,37 +1,20 @@
-import pygame
+class Alien:
+    """外星人群中一个外星人的轻量视图。
 
-from pygame.sprite import Sprite
+    外星人的状态存储在Fleet的数组中，Fleet.sprites()为每个存活的外星人创建一个Alien。
+    Alien只存储自己的位置，所有外星人共用的图像通过它所属的外星人群获取。
+    """
 
+    __slots__ = ('fleet', 'x', 'rect')
 
-class Alien(Sprite):
-    """表示单个外星人的类。"""
-    def __init__(self, ai_game):
-        """初始化外星人并设置其起始位置。"""
-        super().__init__()
-        self.screen = ai_game.screen
-        self.settings = ai_game.settings
-
-        # 加载外星人图像并设置其rect属性
-        self.image = pygame.image.load('images/alien.bmp')
-        self.rect = self.image.get_rect()
-
-        # 每个外星人最初都在屏幕左上角附近。
-        self.rect.x = self.rect.width
-        self.rect.y = self.rect.height
-
+    def __init__(self, fleet, x, rect):
+        """创建一个位于rect处、精确水平位置为x的外星人。"""
+        self.fleet = fleet
         # 存储外星人的精确水平位置。
-        self.x = float(self.rect.x)
-
-    def check_edges(self):
-        """如果外星人位于屏幕边缘，就返回True。"""
-        screen_rect = self.screen.get_rect()
-        if self.rect.right >= screen_rect.right or self.rect.left <= 0:
-            return True
+        self.x = x
+        self.rect = rect
 
-    def update(self):
-        """向左或向右移动外星人。"""
-        # 将移动量设置为外星人速度和fleet_direction 的乘积，让外星人向左或向右移动。
-        # 如果fleet_direction 为 1，就将外星人的当前x坐标增大alien_speed ，从而将外星人向右移；
-        # 如果fleet_direction 为-1，就将外星人的当前x坐标减去alien_speed ，从而将外星人向左移。
-        self.x += (self.settings.alien_speed * self.settings.fleet_direction)
-        self.rect.x = self.x
+    @property
+    def image(self):
+        """所有外星人共享的图像。"""
+        return self.fleet.image
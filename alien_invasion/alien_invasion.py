@@ -1,89 +1,265 @@
+import os
 import sys
-from time import sleep
+from time import perf_counter
 import pygame
 from settings import Settings
 from game_stats import GameStats
 from ship import Ship
 
-from bullet import Bullet
-from alien import Alien
+from bullet import BulletPool
+from fleet import Fleet, fleet_formation
 from button import Button
 from scoreboard import Scoreboard
+from renderer import DirtyRenderer, RenderBatch
+from highscore import HighScoreStore
+from controls import Controls, InputState
 
 
 class AlienInvasion:
     """管理游戏资源与行为的类"""
 
-    def __init__(self):
-        """初始化游戏并创建游戏资源"""
-        # 调用函数pygame.init() 来初始化背景设置，让Pygame能够正确地工作
-        pygame.init()
+    # 无窗口模式下step()可接受的输入标志：前四个对应飞船的移动标志，fire表示按住了开火键
+    INPUT_FLAGS = InputState._fields
+
+    def __init__(self, headless=False, settings=None, screen=None):
+        """初始化游戏并创建游戏资源。
+
+        headless为True时不打开窗口，用于测试、调参和机器人。settings是要使用的Settings实例，
+        为None时使用默认设置；无窗口模式下屏幕尺寸取自settings。screen是无窗口模式下
+        绘制到的surface，其尺寸必须与settings一致；为None时创建一个新的surface。
+        """
+        # 启动过程中每个阶段所用的秒数，见_mark_startup()和startup.py。
+        self.startup_timings = {}
+        self._startup_clock = perf_counter()
+
+        self.headless = headless
+        if headless:
+            # 使用SDL的dummy视频驱动，这样在没有显示器的机器上也能创建surface。必须在初始化Pygame之前设置。
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+        # 只初始化游戏用到的显示和字体模块。pygame.init()会初始化所有模块，包括游戏不使用的音频，
+        # 启动一局无窗口游戏的时间有相当一部分花在这里。
+        pygame.display.init()
+        pygame.font.init()
+        self._mark_startup('pygame')
         # 创建一个Settings 实例并将其赋给self.settings
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
 
         # 调用pygame.display.set_mode() 来创建一个显示窗口，实参是一个元组，指定了游戏窗口的尺寸
         # 赋给属性self.screen的对象是一个surface 在Pygame中，surface是屏幕的一部分，用于显示游戏元素。
         # 传入了尺寸(0, 0)以及参数pygame.FULLSCREEN 这让Pygame生成一个覆盖整个显示器的屏幕。
         # 由于无法预先知道屏幕的宽度和高度，要在创建屏幕后更新这些设置：使用屏幕的rect的属性width和height来更新对象settings
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        # 无窗口模式下不使用全屏，而是按照Settings中的尺寸创建屏幕，这样外星人群的布局在任何机器上都相同。
+        # 每个无窗口游戏都绘制到自己的surface上，这样一个进程中可以同时运行多个游戏；
+        # 仍然需要一个（很小的）显示窗口，以便将图像转换为显示器的像素格式。
+        # 设置了scale_to_display时，游戏按Settings中的尺寸绘制到内部surface上，每帧缩放一次到全屏显示器。
+        self.viewport = None
+        if headless:
+            if pygame.display.get_surface() is None:
+                pygame.display.set_mode((1, 1))
+            if screen is None:
+                screen = pygame.Surface((self.settings.screen_width, self.settings.screen_height)).convert()
+            self.screen = screen
+        elif self.settings.scale_to_display:
+            # 可选的功能只在启用时才导入，以缩短启动时间。
+            from viewport import Viewport
+            display = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            self.viewport = Viewport(display, (self.settings.screen_width, self.settings.screen_height),
+                                     self.settings.smooth_scaling)
+            self.screen = self.viewport.surface
+        else:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         # self.screen = pygame.display.set_mode((1200, 800))
         self.settings.screen_width = self.screen.get_rect().width
         self.settings.screen_height = self.screen.get_rect().height
 
         pygame.display.set_caption("Alien Invasion")
 
+        # 用于限制帧率并测量每帧经过的时间。
+        self.clock = pygame.time.Clock()
+        self._mark_startup('display')
+
+        # 持久保存最高得分的存储。无窗口模式用于测试和批量运行，不应改变玩家的最高得分。
+        if self.settings.high_score_path and not headless:
+            self.high_scores = HighScoreStore(self.settings.high_score_path)
+        else:
+            self.high_scores = None
+
         # 创建一个用于存储游戏统计信息的实例。
         self.stats = GameStats(self)
         self.sb = Scoreboard(self)
+        self._mark_startup('scoreboard')
 
         # 调用Ship()时，必须提供一个参数：一个AlienInvasion实例。
         # 在这里，self 指向的是当前AlienInvasion实例
         # 这个参数让Ship能够访问游戏资源，如对象screen 我们将这个Ship实例赋给了self.ship
         self.ship = Ship(self)
 
-        # 在AlienInvasion中创建一个编组（group），用于存储所有有效的子弹，以便管理发射出去的所有子弹。
-        # 这个编组是pygame.sprite.Group类的一个实例。
-        self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        # 在AlienInvasion中创建一个子弹对象池，用于存储所有有效的子弹，以便管理发射出去的所有子弹。
+        # 它的用法与编组（group）类似，但发射和消失时只是激活和回收预先创建的子弹对象。
+        self.bullets = BulletPool(self, self.settings.bullets_allowed)
+        # 外星人群用NumPy数组存储所有外星人，但提供了与编组类似的接口。
+        self.aliens = Fleet(self)
 
         # 创建外星人群
         self._create_fleet()
+        self._mark_startup('entities')
 
         # 创建Play按钮。
         self.play_button = Button(self, "Play")
 
-        self.fire = False
+        # 模拟读取的输入快照，每帧由Controls或step()替换为新的快照。
+        self.inputs = InputState()
+        self.controls = Controls(self)
+
+        # 每帧的blit命令都收集到这个批次中，一次提交。
+        self.render_batch = RenderBatch(self.screen)
+
+        # 可选的脏矩形渲染器；未启用时每帧都重绘并切换整个屏幕。
+        self.dirty_renderer = DirtyRenderer(self) if self.settings.dirty_rendering else None
+
+        # 可选的分阶段耗时分析器；未启用时主循环不做任何计时。
+        self.profiler = None
+        if self.settings.profiling:
+            from profiler import FrameProfiler
+            self.profiler = FrameProfiler(self)
+
+        # 录制输入时使用的记录器，见record_inputs()。
+        self.recorder = None
+        self._mark_startup('interface')
+
+    def _mark_startup(self, phase):
+        """将上一阶段结束以来的时间记为启动阶段phase所用的时间。"""
+        now = perf_counter()
+        self.startup_timings[phase] = now - self._startup_clock
+        self._startup_clock = now
 
     def run_game(self):
         """开始游戏的主循环"""
+        if self.settings.pipelined:
+            from pipeline import Pipeline
+            Pipeline(self).run()
+            return
+
+        # 每一帧的时长（毫秒）被累积起来，再按固定的模拟步长消耗掉。
+        step_ms = 1000 / self.settings.sim_rate
+        max_lag = self.settings.max_steps_per_frame * step_ms
+        lag = 0.0
+
+        # 启用了分析器时，换用会计时的版本；未启用时主循环与不计时完全相同。
+        # _update_game()调用的各个阶段被替换为计时的版本，因此更新的顺序只在_update_game()中定义一次。
+        profiler = self.profiler
+        check_events = self._check_events
+        update_game = self._update_game
+        update_screen = self._update_screen
+        if profiler is not None:
+            check_events = profiler.timed('events', check_events)
+            self._update_ship = profiler.timed('ship', self._update_ship)
+            self._update_bullets = profiler.timed('bullets', self._update_bullets)
+            self._update_aliens = profiler.timed('aliens', self._update_aliens)
+            self._fire_bullet = profiler.timed('bullets', self._fire_bullet)
+            update_screen = profiler.timed('screen', update_screen)
+        if self.recorder is not None:
+            update_game = self._recorded(update_game)
+
         while True:
-            self._check_events()
+            # tick()会在需要时休眠，使帧率不超过fps_cap，并返回距上一帧经过的毫秒数。
+            elapsed = self.clock.tick(self.settings.fps_cap)
+            check_events()
 
             if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-                self._fire_bullet()
-
-            self._update_screen()
-
-    # 每当用户按键时，都将在Pygame中注册一个事件。事件都是通过方法pygame.event.get() 获取的
-    # 因此需要在方法_check_events() 中指定要检查哪些类型的事件。每次按键都被注册为一个KEYDOWN 事件。
+                if self.settings.fixed_timestep:
+                    lag = min(lag + elapsed, max_lag)
+                    # 游戏可能在这一帧的某个模拟步中结束，此后不再推进，剩余的时间也被丢弃。
+                    while lag >= step_ms and self.stats.game_active:
+                        update_game()
+                        lag -= step_ms
+                    if not self.stats.game_active:
+                        lag = 0.0
+                else:
+                    update_game(min(elapsed / step_ms, self.settings.max_steps_per_frame))
+
+            update_screen()
+            if profiler is not None:
+                profiler.end_frame()
+
+    def _update_game(self, dt=1.0):
+        """推进游戏逻辑，不涉及任何绘制。dt是经过的时间，以模拟步为单位。"""
+        # 飞船被撞后的暂停期间，游戏元素都保持不动，但主循环仍在处理事件和绘制屏幕。
+        if self.stats.state == GameStats.RESPAWNING:
+            self.stats.update_respawn(dt)
+            return
+
+        self._update_ship(dt)
+        self._update_bullets(dt)
+        self._update_aliens(dt)
+        self._fire_bullet()
+
+    def _update_ship(self, dt=1.0):
+        """根据移动标志移动飞船。"""
+        self.ship.update(dt)
+
+    def record_inputs(self, path):
+        """将此后每个模拟步的输入录制到文件path中，以便用recorder.replay()回放。
+
+        为了让回放得到相同的结果，录制时总是按固定的模拟步长推进。
+        """
+        self.settings.fixed_timestep = True
+        from recorder import InputRecorder
+        self.recorder = InputRecorder(path, self.settings)
+
+    def _recorded(self, update_game):
+        """返回一个函数，它先记录当前的输入，再调用update_game推进一步。"""
+        def recorded_update_game(dt=1.0):
+            self.recorder.record(self)
+            update_game(dt)
+        return recorded_update_game
+
+    def step(self, n_frames=1, inputs=None):
+        """在不绘制屏幕的情况下推进n_frames帧，每帧为一个模拟步，返回实际推进的帧数。
+
+        inputs是一个InputState，或一个字典，键为INPUT_FLAGS中的标志，值为布尔值，表示在这些帧中按住了哪些键；
+        字典中没有的标志保持不变。
+        与run_game()一样，游戏处于非活动状态时不推进，因此游戏结束后会提前返回。
+        飞船被撞后的暂停也按帧计算，因此不会花费任何墙上时间。
+        """
+        if inputs is not None:
+            self._apply_inputs(inputs)
+
+        frames = 0
+        while frames < n_frames and self.stats.game_active:
+            self._update_game()
+            frames += 1
+        return frames
+
+    def _apply_inputs(self, inputs):
+        """发布新的输入快照，并将移动标志设置到飞船上。"""
+        if not isinstance(inputs, InputState):
+            for flag in inputs:
+                if flag not in self.INPUT_FLAGS:
+                    raise ValueError(f"未知的输入标志：{flag}")
+            inputs = self.inputs._replace(**{flag: bool(value) for flag, value in inputs.items()})
+        self.inputs = inputs
+        ship = self.ship
+        ship.moving_right = inputs.moving_right
+        ship.moving_left = inputs.moving_left
+        ship.moving_up = inputs.moving_up
+        ship.moving_down = inputs.moving_down
+
+    # 每当用户按键时，都将在Pygame中注册一个事件。事件由Controls通过pygame.event.get() 获取并分派。
     def _check_events(self):
-        """监视键盘和鼠标事件"""
-        # 为访问Pygame检测到的事件，我们使用了函数pygame.event.get()
-        # 这个函数返回一个列表，其中包含它在上一次被调用后发生的所有事件。所有键盘和鼠标事件都将导致这个for循环运行。
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                # 使用pygame.mouse.get_pos() ，它返回一个元组，其中包含玩家单击时鼠标的坐标，我们将这些值传递给新方法_check_play_button()
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
+        """监视键盘和鼠标事件，并发布这一帧的输入快照。"""
+        self._apply_inputs(self.controls.poll())
+
+    def _quit(self):
+        """导出需要在退出时保存的数据，然后退出游戏。"""
+        if self.profiler is not None and self.settings.profile_export:
+            self.profiler.export(self.settings.profile_export)
+        if self.recorder is not None:
+            self.recorder.close(self.stats)
+        if self.high_scores is not None:
+            self.high_scores.close()
+        sys.exit()
 
     def _check_play_button(self, mouse_pos):
         """在玩家单击Play按钮时开始新游戏。"""
@@ -94,9 +270,12 @@ class AlienInvasion:
 
     def start_game(self):
         """按p开始游戏"""
-        # 重置游戏统计信息，给玩家提供三艘新飞船，将game_active设置为True
+        if self.recorder is not None:
+            self.recorder.mark_start()
+
+        # 重置游戏统计信息，给玩家提供三艘新飞船，并进入PLAYING状态
         self.stats.reset_stats()
-        self.stats.game_active = True
+        self.stats.state = GameStats.PLAYING
         self.sb.prep_score()
         self.sb.prep_level()
         self.sb.prep_ships()
@@ -111,72 +290,48 @@ class AlienInvasion:
 
         # 隐藏鼠标光标。
         # set_visible() 传递False ，让Pygame在光标位于游戏窗口内时将其隐藏起来。
-        pygame.mouse.set_visible(False)
+        # 流水线模式下光标由主线程按快照中的游戏状态切换。
+        if not self.settings.pipelined:
+            pygame.mouse.set_visible(False)
 
         # 重置游戏设置。
         self.settings.initialize_dynamic_settings()
 
-    def _check_keydown_events(self, event):
-        """响应按键。"""
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = True
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = True
-        elif event.key == pygame.K_UP:
-            self.ship.moving_up = True
-        elif event.key == pygame.K_DOWN:
-            self.ship.moving_down = True
-        elif event.key == pygame.K_q:
-            sys.exit()
-        elif event.key == pygame.K_p:
-            self.start_game()
-        elif event.key == pygame.K_SPACE:
-            self.fire = True
-
-    def _check_keyup_events(self, event):
-        """响应松开。"""
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = False
-        elif event.key == pygame.K_UP:
-            self.ship.moving_up = False
-        elif event.key == pygame.K_DOWN:
-            self.ship.moving_down = False
-        elif event.key == pygame.K_SPACE:
-            self.fire = False
+    def _invalidate_screen(self):
+        """让下一帧完整地重绘整个屏幕。未启用脏矩形渲染时每帧本来就会重绘整个屏幕。"""
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
+
+    def _toggle_profiler_overlay(self):
+        """显示或隐藏分析器的耗时叠加层。"""
+        if self.profiler is not None:
+            self.profiler.show_overlay = not self.profiler.show_overlay
 
     def _fire_bullet(self):
-        """创建一颗子弹，并将其加入编组bullets中。"""
-        if len(self.bullets) < self.settings.bullets_allowed and self.fire:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
+        """从对象池中激活一颗子弹。"""
+        if len(self.bullets) < self.settings.bullets_allowed and self.inputs.fire:
+            self.bullets.fire()
 
-    def _update_bullets(self):
+    def _update_bullets(self, dt=1.0):
         """更新子弹的位置并删除消失的子弹。"""
         # 更新子弹的位置。
-        # 对编组调用update()时，编组自动对其中的每个精灵调用update() 。
-        # 因此代码行bullets.update()将为编组bullets中的每颗子弹调用bullet.update()
-        self.bullets.update()
-        # 因为不能从for循环遍历的列表或编组中删除元素，所以必须遍历编组的副本。
-        # 我们使用方法copy()来设置for循环，从而能够在循环中修改bullets
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+        # 对对象池调用update()时，它自动对其中的每颗活跃子弹调用bullet.update()
+        self.bullets.update(dt)
+        # 回收已经消失的子弹。对象池就地压缩活跃子弹的列表，无需复制。
+        self.bullets.remove_offscreen()
 
+        # 外星人被全部消灭时，_check_bullet_alien_collisions()会清空子弹并创建新的外星人群。
         self._check_bullet_alien_collisions()
 
-        if not self.aliens:
-            self.bullets.empty()
-            self._create_fleet()
-
     def _check_bullet_alien_collisions(self):
         """响应子弹和外星人碰撞。"""
         # 将self.bullets 中所有的子弹都与self.aliens 中所有的外星人进行比较，看它们是否重叠在一起。
         # 每当有子弹和外星人的rect重叠时，groupcollide()就在它返回的字典中添加一个键值对。
         # 与外星人碰撞的子弹都是字典collisions 中的一个键，而与每颗子弹相关的值都是一个列表，其中包含该子弹击中的外星人。
         # 两个实参True让Pygame删除发生碰撞的子弹和外星人。
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+        # 外星人群按行和列查找每颗子弹附近的外星人，结果与pygame.sprite.groupcollide()相同，
+        # 只是字典的值是被击中外星人的下标数组。
+        collisions = self.aliens.groupcollide(self.bullets, True, True)
 
         if collisions:
             for aliens in collisions.values():
@@ -189,29 +344,29 @@ class AlienInvasion:
             # 如果编组aliens 为空，就使用方法empty()删除编组中余下的所有精灵，从而删除现有的所有子弹
             self.bullets.empty()
             self._create_fleet()
-            self.settings.increase_speed()
 
-            # 提高等级，增加子弹。
-            self.stats.level += 1
-            self.settings.bullets_allowed += 1
-            self.sb.prep_level()
+            # 提高等级，从等级表中取出新等级的速度、分数和子弹数。
+            self.set_level(self.stats.level + 1)
+
+    def set_level(self, level):
+        """直接进入第level级，不必逐级过关。"""
+        self.settings.apply_level(level)
+        self.stats.level = level
+        self.sb.prep_level()
 
-    def _update_aliens(self):
+    def _update_aliens(self, dt=1.0):
         """检查是否有外星人位于屏幕边缘，并更新整群外星人的位置。"""
         self._check_fleet_edges()
-        self.aliens.update()
+        self.aliens.update(dt)
         # for alien in self.aliens.copy():
         #     if alien.rect.top <= 0:
         #         self.aliens.remove(alien)
         # print(len(self.aliens))
 
-        # 函数spritecollideany()接受两个实参：一个精灵和一个编组。
-        # 它检查编组是否有成员与精灵发生了碰撞，并在找到与精灵发生碰撞的成员后停止遍历编组。
-        # 在这里，它遍历编组aliens ，并返回找到的第一个与飞船发生碰撞的外星人。
-        # 如果没有发生碰撞，spritecollideany()将返回None，因此处的if代码块不会执行。
-        # 如果找到了与飞船发生碰撞的外星人，它就返回这个外星人，因此if代码块将执行：打印
+        # 方法spritecollideany()检查外星人群是否有成员与飞船发生了碰撞。
+        # 它返回与飞船发生碰撞的外星人的下标，如果没有发生碰撞，就返回None，因此此处的if代码块不会执行。
         # 检查是否有外星人撞到飞船。
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.aliens.spritecollideany(self.ship) is not None:
             self._ship_hit()
 
         # 检查是否有外星人到达了屏幕底端。
@@ -219,75 +374,82 @@ class AlienInvasion:
 
     def _create_fleet(self):
         """创建外星人群。"""
-        # 创建一个外星人并计算一行可容纳多少个外星人。
-        # 外星人的间距为外星人宽度。
-        alien = Alien(self)
-
-        # 属性size是一个元组，包含rect对象的宽度和高度。
-        alien_width, alien_height = alien.rect.size
-        available_space_x = self.settings.screen_width - (2 * alien_width)
-        number_aliens_x = available_space_x // (2 * alien_width)
-
-        # 计算屏幕可容纳多少行外星人。
-        ship_height = self.ship.rect.height
-        available_space_y = (self.settings.screen_height - (3 * alien_height) - ship_height)
-        number_rows = available_space_y // (2 * alien_height)
-
-        # 创建外星人群。
-        for row_number in range(number_rows):
-            for alien_number in range(number_aliens_x):
-                self._create_alien(alien_number, row_number)
-
-    def _create_alien(self, alien_number, row_number):
-        """创建一个外星人，并将其放在当前行。"""
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        alien.x = alien_width + 2 * alien_width * alien_number
-        alien.rect.x = alien.x
-        alien.rect.y = alien.rect.height + 2 * alien.rect.height * row_number
-        self.aliens.add(alien)
+        # 队形只取决于屏幕、外星人和飞船的尺寸，第一次计算后就被缓存起来，
+        # 此后每次创建外星人群都只是将缓存的队形批量复制到外星人群中。
+        formation = fleet_formation(self.settings.screen_width, self.settings.screen_height,
+                                    self.aliens.width, self.aliens.height, self.ship.rect.height)
+        self.aliens.spawn_formation(formation)
 
     def _check_fleet_edges(self):
         """有外星人到达边缘时采取相应的措施。"""
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.aliens.check_edges():
+            self._change_fleet_direction()
 
     def _change_fleet_direction(self):
         """将整群外星人下移，并改变它们的方向。"""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        self.aliens.drop(self.settings.fleet_drop_speed)
         self.settings.fleet_direction *= -1
 
     def _update_screen(self):
         """更新屏幕上的图像，并切换到新屏幕。"""
+        # 启用了脏矩形渲染时，只擦除和更新发生变化的区域。
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.update_screen()
+            return
 
         # 调用方法fill() 用这种背景色填充屏幕。方法fill()用于处理surface，只接受一个实参：一种颜色
         self.screen.fill(self.settings.bg_color)
 
-        # 填充背景后，调用ship.blitme()将飞船绘制到屏幕上，确保它出现在背景前面
-        self.ship.draw_ship()
+        self.draw_elements(return_rects=False)
+
+        # 调用pygame.display.flip() ，命令Pygame让最近绘制的屏幕可见。
+        # 在这里，它在每次执行while循环时都绘制一个空屏幕，并擦去旧屏幕，使得只有新屏幕可见。
+        # 我们移动游戏元素时，pygame.display.flip()将不断更新屏幕，以显示元素的新位置，并且在原来的位置隐藏元素，从而营造平滑移动的效果。
+        self.present()
+
+    def present(self, rects=None):
+        """让最近绘制的屏幕可见。rects为None时切换整个屏幕，否则只更新这些区域。"""
+        if self.viewport is not None:
+            # 缩放时整个内部surface都要缩放到显示器上，无法只更新部分区域。
+            self.viewport.present()
+        elif rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def draw_elements(self, return_rects=True):
+        """将所有游戏元素绘制到屏幕上。
 
-        # bullets.sprites()返回一个列表，其中包含编组bullets中的所有精灵
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
+        所有元素的blit命令按绘制顺序收集到一个批次中，一次提交。
+        return_rects为True时返回被绘制区域的rect列表，否则返回None。
+        """
+        batch = self.render_batch
 
-        # 调用draw()时，Pygame将把编组中的每个元素绘制到属性rect指定的位置。
-        # 方法draw()接受一个参数，这个参数指定了要将编组中的元素绘制到哪个surface上
-        self.aliens.draw(self.screen)
+        # 填充背景后绘制飞船，确保它出现在背景前面
+        batch.add(self.ship.image, self.ship.rect)
+
+        # 所有子弹共用一幅预先绘制好的图像。
+        batch.extend(self.bullets.blit_sequence())
+
+        # 每个存活的外星人（或启用了预绘制时的每行外星人）各一个命令。
+        batch.extend(self.aliens.blit_sequence())
 
         # 显示得分。
-        self.sb.show_score()
+        batch.extend(self.sb.blit_sequence())
 
         # 如果游戏处于非活动状态，就绘制Play按钮。
         if not self.stats.game_active:
-            self.play_button.draw_button()
+            batch.add(self.play_button.image, self.play_button.rect)
 
-        # 调用pygame.display.flip() ，命令Pygame让最近绘制的屏幕可见。
-        # 在这里，它在每次执行while循环时都绘制一个空屏幕，并擦去旧屏幕，使得只有新屏幕可见。
-        # 我们移动游戏元素时，pygame.display.flip()将不断更新屏幕，以显示元素的新位置，并且在原来的位置隐藏元素，从而营造平滑移动的效果。
-        pygame.display.flip()
+        rects = batch.submit(return_rects)
+
+        # 显示分阶段耗时统计。
+        if self.profiler is not None and self.profiler.show_overlay:
+            overlay_rects = self.profiler.draw_overlay(self.screen)
+            if return_rects:
+                rects.extend(overlay_rects)
+
+        return rects
 
     def _ship_hit(self):
         """响应飞船被外星人撞到。"""
@@ -305,24 +467,44 @@ class AlienInvasion:
             self._create_fleet()
             self.ship.center_ship()
 
-            # 暂停。
-            sleep(0.5)
+            # 暂停。暂停由游戏时钟计时，期间主循环仍然响应事件并绘制屏幕。
+            self.stats.start_respawn()
         else:
-            self.stats.game_active = False
-            pygame.mouse.set_visible(True)
+            self.stats.state = GameStats.GAME_OVER
+            # 流水线模式下这里运行在模拟线程中，光标由主线程按快照中的游戏状态切换。
+            if not self.settings.pipelined:
+                pygame.mouse.set_visible(True)
 
     def _check_aliens_bottom(self):
         """检查是否有外星人到达了屏幕底端。"""
-        screen_rect = self.screen.get_rect()
-        for alien in self.aliens.sprites():
-            # 到达屏幕底端后，外星人的属性rect.bottom 大于或等于屏幕的属性rect.bottom
-            if alien.rect.bottom >= screen_rect.bottom:
-                # 像飞船被撞到一样处理。
-                self._ship_hit()
-                break
+        # 到达屏幕底端后，外星人的rect.bottom大于或等于屏幕的属性rect.bottom
+        if self.aliens.check_bottom():
+            # 像飞船被撞到一样处理。
+            self._ship_hit()
 
 
 if __name__ == '__main__':
-    # 创建游戏并运行
-    ai = AlienInvasion()
-    ai.run_game()
+    import argparse
+    from recorder import replay
+
+    parser = argparse.ArgumentParser(description="外星人入侵")
+    parser.add_argument('--record', metavar='FILE', help="将每个模拟步的输入录制到FILE")
+    parser.add_argument('--replay', metavar='FILE', help="在无窗口模式下以最快速度回放FILE中的录像")
+    parser.add_argument('--levels', metavar='FILE', help="从JSON文件FILE中读取等级进度")
+    args = parser.parse_args()
+
+    if args.replay:
+        ai, steps, result = replay(args.replay)
+        print(f"score {ai.stats.score}  level {ai.stats.level}  steps {steps}")
+        if result is not None and (result['score'], result['level']) != (ai.stats.score, ai.stats.level):
+            print(f"与录制时的结果不同：score {result['score']}  level {result['level']}")
+            sys.exit(1)
+    else:
+        # 创建游戏并运行
+        settings = Settings()
+        if args.levels:
+            settings.load_level_schedule(args.levels)
+        ai = AlienInvasion(settings=settings)
+        if args.record:
+            ai.record_inputs(args.record)
+        ai.run_game()
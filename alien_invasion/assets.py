@@ -0,0 +1,40 @@
+import os
+
+import pygame
+
+# 图像目录相对于本文件解析，而不是相对于当前工作目录，这样从任何目录启动游戏都能找到图像。
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
+
+# 已加载的图像，键为文件名。所有精灵共享这些surface。
+_images = {}
+
+# 已加载的字体，键为字号。
+_fonts = {}
+
+
+def load_image(name):
+    """返回images目录中名为name的图像，每幅图像只从磁盘加载一次。
+
+    如果已经创建了显示窗口，就将图像转换为显示器的像素格式，这样blit时无需再逐像素转换。
+    图像的背景色与屏幕背景色相同，因此将左上角像素的颜色设置为透明色，并启用RLE加速。
+    """
+    image = _images.get(name)
+    if image is None:
+        image = pygame.image.load(os.path.join(IMAGES_DIR, name))
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        image.set_colorkey(image.get_at((0, 0)), pygame.RLEACCEL)
+        _images[name] = image
+    return image
+
+
+def load_font(size):
+    """返回Pygame默认字体的size号字体，每个字号只加载一次，由所有使用它的对象共享。
+
+    与pygame.font.SysFont(None, size)得到的字体相同，但不会先扫描系统中安装的所有字体。
+    """
+    font = _fonts.get(size)
+    if font is None:
+        font = pygame.font.Font(None, size)
+        _fonts[size] = font
+    return font
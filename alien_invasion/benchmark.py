@@ -0,0 +1,217 @@
+"""在无窗口模式下运行一组固定场景，测量游戏主循环的性能。
+
+每个场景指定屏幕分辨率（决定外星人群的规模）、允许的子弹数和等级。
+每个场景测量若干轮，每轮都从相同的游戏状态开始推进相同的帧数，耗时取最好的一轮。
+各场景按轮交替测量（每轮依次测量每个场景一次），因此每个场景的各轮分布在整个运行期间，
+机器速度在几秒内的波动不会让某个场景的所有轮都变慢，也就不会被当作性能下降。
+与基准比较时，比基准差的场景会再测量一次，与耗时有关的指标取两次中较好的值，只有再次变差才算性能下降。
+结果以JSON格式写入文件，并可以与保存的基准结果比较：任何场景的性能比基准差超过阈值时，
+以非零状态退出。
+
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json --threshold 0.15
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from itertools import product
+from time import perf_counter
+
+from alien_invasion import AlienInvasion
+from settings import Settings
+
+RESOLUTIONS = ((1200, 800), (1920, 1080), (3840, 2160))
+BULLETS_ALLOWED = (3, 50)
+LEVELS = (1, 5)
+
+# 指标名称、方向（1表示越大越好，-1表示越小越好）、允许变差的绝对量，以及指标是否与耗时有关（重新测量时取较好的值）。
+# 变差不超过这个绝对量时，即使相对变化超过阈值（例如基准值很小或为0时）也不算性能下降。
+METRICS = {
+    'fps': (1, 0.0, True),
+    'collision_us_per_frame': (-1, 1.0, True),
+    'gc_gen0_per_kframe': (-1, 1.0, False),
+    'alloc_peak_kib': (-1, 1.0, False),
+}
+
+
+def scenarios():
+    """生成所有场景，每个场景是一个(名称, 宽度, 高度, 子弹数, 等级)元组。"""
+    for (width, height), bullets, level in product(RESOLUTIONS, BULLETS_ALLOWED, LEVELS):
+        yield f"{width}x{height}-b{bullets}-l{level}", width, height, bullets, level
+
+
+def build_game(width, height, bullets, level):
+    """创建一个无窗口游戏，开始游戏并将其推进到指定的等级。"""
+    settings = Settings()
+    settings.screen_width = width
+    settings.screen_height = height
+    # 允许的子弹数写入等级进度，这样无论进入哪一级、过关多少次，子弹数都保持不变。
+    settings.initial_bullets_allowed = bullets
+    settings.bullets_per_level = 0
+    ai_game = AlienInvasion(headless=True, settings=settings)
+    start_game(ai_game, level)
+    return ai_game
+
+
+def start_game(ai_game, level):
+    """开始一局新游戏，并直接进入指定的等级。"""
+    ai_game.start_game()
+    ai_game.set_level(level)
+
+
+def scripted_inputs(frame):
+    """一直开火，并每隔120帧改变一次移动方向。"""
+    moving_right = (frame // 120) % 2 == 0
+    return {'fire': True, 'moving_right': moving_right, 'moving_left': not moving_right}
+
+
+def run_frames(ai_game, frames, level, chunk=10):
+    """推进frames帧，游戏结束时重新开始。"""
+    done = 0
+    while done < frames:
+        n = min(chunk, frames - done)
+        done += ai_game.step(n, scripted_inputs(done))
+        if not ai_game.stats.game_active:
+            start_game(ai_game, level)
+
+
+def time_round(width, height, bullets, level, frames, warmup=200):
+    """创建一个新游戏，推进warmup帧后测量frames帧。
+
+    返回(游戏, 耗时, 碰撞检测的耗时, 第0代垃圾回收的次数)，耗时以秒为单位。
+    """
+    ai_game = build_game(width, height, bullets, level)
+    run_frames(ai_game, warmup, level)
+
+    # 统计碰撞检测的耗时，测量结束后恢复原来的方法。
+    collision_time = [0.0]
+    check_collisions = ai_game._check_bullet_alien_collisions
+
+    def timed_check_collisions():
+        start = perf_counter()
+        check_collisions()
+        collision_time[0] += perf_counter() - start
+    ai_game._check_bullet_alien_collisions = timed_check_collisions
+
+    gc.collect()
+    gen0_before = gc.get_stats()[0]['collections']
+    start = perf_counter()
+    run_frames(ai_game, frames, level)
+    elapsed = perf_counter() - start
+    gen0 = gc.get_stats()[0]['collections'] - gen0_before
+    ai_game._check_bullet_alien_collisions = check_collisions
+    return ai_game, elapsed, collision_time[0], gen0
+
+
+def alloc_peak(ai_game, frames, level):
+    """推进frames帧，返回这期间临时分配的内存峰值（字节）。"""
+    # tracemalloc会明显拖慢游戏，因此不与计时的轮同时运行。
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    run_frames(ai_game, frames, level)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - baseline
+
+
+def run_scenarios(selected, frames, repeats):
+    """按轮交替测量selected中的所有场景，返回一个字典，键为场景名称，值为它的各项指标。"""
+    rounds = {name: [] for name, *_ in selected}
+    games = {}
+    for _ in range(repeats):
+        for name, width, height, bullets, level in selected:
+            ai_game, elapsed, collision, gen0 = time_round(width, height, bullets, level, frames)
+            rounds[name].append((elapsed, collision, gen0))
+            games[name] = ai_game
+
+    results = {}
+    for name, width, height, bullets, level in selected:
+        elapsed, collision, gen0 = zip(*rounds[name])
+        ai_game = games[name]
+        results[name] = {
+            # 外星人群的规模，即完整队形中的外星人数。
+            'aliens': len(ai_game.aliens.formation),
+            'frames': frames,
+            'repeats': repeats,
+            'fps': frames / min(elapsed),
+            'collision_us_per_frame': min(collision) / frames * 1e6,
+            'gc_gen0_per_kframe': sum(gen0) / (frames * repeats) * 1000,
+            'alloc_peak_kib': alloc_peak(ai_game, min(frames, 500), level) / 1024,
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """返回比基准差超过threshold的所有指标，每项是一个(场景, 指标, 基准值, 当前值)元组。"""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, (direction, absolute, _) in METRICS.items():
+            old, new = base.get(metric), metrics[metric]
+            if old is None:
+                continue
+            change = (new - old) * direction
+            if change >= -absolute:
+                continue
+            # 基准值为0时无法计算相对变化，只比较绝对变化。
+            if old == 0 or change / old < -threshold:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def keep_best(results, remeasured):
+    """将重新测量的结果合并到results中：与耗时有关的指标取较好的值，其余指标使用新值。"""
+    for name, metrics in remeasured.items():
+        old = results[name]
+        for metric, (direction, _, timed) in METRICS.items():
+            if timed:
+                metrics[metric] = max(old[metric] * direction, metrics[metric] * direction) * direction
+        metrics['repeats'] += old['repeats']
+        results[name] = metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alien Invasion 无窗口性能基准测试")
+    parser.add_argument('--frames', type=int, default=2000, help="每个场景每轮测量的帧数")
+    parser.add_argument('--repeats', type=int, default=7, help="每个场景测量的轮数")
+    parser.add_argument('--only', default='', help="只运行名称中包含这个字符串的场景")
+    parser.add_argument('--output', help="将结果以JSON格式写入这个文件")
+    parser.add_argument('--baseline', help="与这个文件中的基准结果比较")
+    parser.add_argument('--save-baseline', metavar='PATH', help="将结果保存为基准")
+    parser.add_argument('--threshold', type=float, default=0.15, help="允许的最大性能下降比例")
+    args = parser.parse_args(argv)
+
+    selected = [scenario for scenario in scenarios() if args.only in scenario[0]]
+    results = run_scenarios(selected, args.frames, args.repeats)
+    for name, metrics in results.items():
+        print(f"{name:<22} aliens {metrics['aliens']:>5}  fps {metrics['fps']:>9.1f}  "
+              f"collision {metrics['collision_us_per_frame']:>8.1f} us/frame  "
+              f"gc0 {metrics['gc_gen0_per_kframe']:>6.1f}/kframe  peak {metrics['alloc_peak_kib']:>8.1f} KiB")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            # 偶然的干扰很少在同一个场景上连续出现两次，因此只有再次测量仍然变差的场景才算性能下降。
+            names = {name for name, *_ in regressions}
+            keep_best(results, run_scenarios([s for s in selected if s[0] in names], args.frames, args.repeats))
+            regressions = compare(results, baseline, args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"性能下降：{name} {metric} {old:.2f} -> {new:.2f}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,39 +1,118 @@
 import pygame
 
-# Bullet类继承了从模块pygame.sprite 导入的Sprite 类。通过使用精灵（sprite），可将游戏中相关的元素编组，进而同时操作编组中的所有元素。
-from pygame.sprite import Sprite
 
+class Bullet:
+    """管理飞船所发射子弹的类
 
-class Bullet(Sprite):
-    """管理飞船所发射子弹的类"""
+    子弹只存储自己的位置；屏幕、设置、颜色和图像等所有子弹共用的引用都由对象池持有。
+    """
 
-    def __init__(self, ai_game):
-        """在飞船当前位置创建一个子弹对象。"""
-        super().__init__()
-        self.screen = ai_game.screen
-        self.settings = ai_game.settings
-        self.color = self.settings.bullet_color
+    __slots__ = ('pool', 'rect', 'y')
+
+    def __init__(self, pool):
+        """在飞船当前位置创建一个属于对象池pool的子弹对象。"""
+        self.pool = pool
+        settings = pool.settings
 
         # 提供矩形左上角的x坐标和y坐标，以及矩形的宽度和高度。
-        # 我们在(0, 0)处创建这个矩形，子弹的宽度和高度是从self.settings中获取的。
-        self.rect = pygame.Rect(0, 0, self.settings.bullet_width, self.settings.bullet_height)
+        # 我们在(0, 0)处创建这个矩形，子弹的宽度和高度是从设置中获取的。
+        self.rect = pygame.Rect(0, 0, settings.bullet_width, settings.bullet_height)
 
+        self.y = None
+        self.reset(pool.ai_game.ship)
+
+    def reset(self, ship):
+        """将子弹放到飞船当前的位置，以便重复使用这个子弹对象。"""
         # 将其移到正确的位置，因为子弹的初始位置取决于飞船当前的位置。
-        self.rect.midtop = ai_game.ship.rect.midtop
+        self.rect.midtop = ship.rect.midtop
 
         # 存储用小数表示的子弹位置。
         self.y = float(self.rect.y)
 
-    def update(self):
-        """向上移动子弹。"""
+    def update(self, dt=1.0):
+        """向上移动子弹。dt是经过的时间，以模拟步为单位。"""
 
         # 发射出去后，子弹向上移动，意味着其y坐标将不断减小。
-        self.y -= self.settings.bullet_speed
+        self.y -= self.pool.settings.bullet_speed * dt
 
         # 更新表示子弹的rect的位置。
         self.rect.y = self.y
 
-    def draw_bullet(self):
-        """在屏幕上绘制子弹。"""
-        # draw.rect()函数使用存储在self.color中的颜色填充表示子弹的rect占据的屏幕部分
-        pygame.draw.rect(self.screen, self.color, self.rect)
+
+class BulletPool:
+    """预先分配子弹并重复使用它们的对象池，提供与编组类似的接口。
+
+    发射子弹时从空闲列表中取出一个子弹对象并重置其位置，子弹消失后再放回空闲列表，
+    因此游戏过程中不会不断创建和回收子弹对象。活跃的子弹按发射的先后顺序存储。
+    """
+
+    def __init__(self, ai_game, size):
+        """初始化对象池，并预先创建size个子弹。"""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.color = self.settings.bullet_color
+        self.active = []
+
+        # 所有子弹共用的图像，绘制时整个对象池只需一次blits()调用。
+        self.image = pygame.Surface((self.settings.bullet_width, self.settings.bullet_height)).convert()
+        self.image.fill(self.color)
+        self.free = [Bullet(self) for _ in range(size)]
+
+    def __len__(self):
+        return len(self.active)
+
+    def __bool__(self):
+        return bool(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def sprites(self):
+        """返回活跃子弹的列表。返回的是对象池内部的列表，遍历期间不能删除子弹。"""
+        return self.active
+
+    def blit_sequence(self):
+        """返回绘制所有活跃子弹的(图像, rect)列表，供Surface.blits()使用。"""
+        image = self.image
+        return [(image, bullet.rect) for bullet in self.active]
+
+    def fire(self):
+        """在飞船当前位置激活一颗子弹并返回它。空闲列表为空时才创建新的子弹对象。"""
+        if self.free:
+            bullet = self.free.pop()
+            bullet.reset(self.ai_game.ship)
+        else:
+            bullet = Bullet(self)
+        self.active.append(bullet)
+        return bullet
+
+    def update(self, dt=1.0):
+        """移动所有活跃的子弹。"""
+        for bullet in self.active:
+            bullet.update(dt)
+
+    def remove_offscreen(self):
+        """回收已经从屏幕顶端消失的子弹。"""
+        self._compact(lambda bullet: bullet.rect.bottom > 0)
+
+    def remove(self, *bullets):
+        """回收指定的子弹。"""
+        removed = set(bullets)
+        self._compact(lambda bullet: bullet not in removed)
+
+    def empty(self):
+        """回收所有活跃的子弹。"""
+        self.free.extend(self.active)
+        self.active.clear()
+
+    def _compact(self, keep):
+        """就地删除活跃列表中keep()返回False的子弹，并保持其余子弹的顺序。"""
+        active = self.active
+        kept = 0
+        for bullet in active:
+            if keep(bullet):
+                active[kept] = bullet
+                kept += 1
+            else:
+                self.free.append(bullet)
+        del active[kept:]
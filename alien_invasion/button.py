@@ -1,4 +1,6 @@
-import pygame.font
+import pygame
+
+from assets import load_font
 
 
 class Button:
@@ -12,8 +14,8 @@ class Button:
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
 
-        # 实参None让Pygame使用默认字体，而48指定了文本的字号。
-        self.font = pygame.font.SysFont(None, 48)
+        # 使用Pygame默认字体的48号字体，它与记分牌共用同一个字体对象。
+        self.font = load_font(48)
 
         # 为让按钮在屏幕上居中，创建一个表示按钮的rect对象并将其center属性设置为屏幕的center 属性。
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -35,9 +37,7 @@ class Button:
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
-    def draw_button(self):
-        # 调用screen.fill() 来绘制表示按钮的矩形
-        # 调用screen.blit() 并向它传递一幅图像以及与该图像相关联的rect ，从而在屏幕上绘制文本图像
-        self.screen.fill(self.button_color, self.rect)
-        self.screen.blit(self.msg_image, self.msg_image_rect)
-
+        # 将按钮和文本预先合成为一幅图像，绘制按钮时只需在批量绘制中添加一个命令。
+        self.image = pygame.Surface(self.rect.size).convert()
+        self.image.fill(self.button_color)
+        self.image.blit(self.msg_image, self.msg_image_rect.move(-self.rect.x, -self.rect.y))
@@ -0,0 +1,122 @@
+"""键盘和鼠标输入。
+
+Controls只接收游戏需要的输入和窗口事件，其余事件（如大量的鼠标移动）在进入事件队列之前就被丢弃，
+因此处理事件的开销不随这些事件的多少而变化。按键通过预先计算好的表分派，
+每帧处理完事件后得到一个不可变的输入快照InputState，模拟只读取这个快照。
+无窗口模式和回放不经过Controls，而是直接把InputState交给AlienInvasion.step()。
+"""
+from typing import NamedTuple
+
+import pygame
+
+
+class InputState(NamedTuple):
+    """某一帧按住了哪些键。"""
+    moving_right: bool = False
+    moving_left: bool = False
+    moving_up: bool = False
+    moving_down: bool = False
+    fire: bool = False
+
+    @property
+    def bits(self):
+        """以整数表示的输入，各位的含义见INPUT_BITS。"""
+        return _BITS[self]
+
+    @classmethod
+    def from_bits(cls, bits):
+        """返回整数bits表示的输入，多余的位被忽略。"""
+        return _SNAPSHOTS[bits & ALL_BITS]
+
+
+# 输入中每一位的含义，与InputState中的字段依次对应。录像文件也使用这些位，不能改变。
+INPUT_BITS = {name: 1 << i for i, name in enumerate(InputState._fields)}
+ALL_BITS = sum(INPUT_BITS.values())
+
+# 所有可能的快照都预先创建好，每帧发布快照时不必创建新对象。
+_SNAPSHOTS = tuple(InputState(*(bool(bits & bit) for bit in INPUT_BITS.values()))
+                   for bits in range(ALL_BITS + 1))
+_BITS = {snapshot: bits for bits, snapshot in enumerate(_SNAPSHOTS)}
+
+
+class Controls:
+    """将Pygame事件转换为输入快照和游戏命令的类。"""
+
+    # 按住时才有效的键，对应InputState中的字段。
+    HELD_KEYS = {
+        pygame.K_RIGHT: 'moving_right',
+        pygame.K_LEFT: 'moving_left',
+        pygame.K_UP: 'moving_up',
+        pygame.K_DOWN: 'moving_down',
+        pygame.K_SPACE: 'fire',
+    }
+
+    # 按下时执行一次的键，对应AlienInvasion的方法。
+    COMMAND_KEYS = {
+        pygame.K_q: '_quit',
+        pygame.K_p: 'start_game',
+        pygame.K_F3: '_toggle_profiler_overlay',
+    }
+
+    def __init__(self, ai_game):
+        """建立分派表。"""
+        self.ai_game = ai_game
+        self._key_bits = {key: INPUT_BITS[name] for key, name in self.HELD_KEYS.items()}
+        self._commands = {key: getattr(ai_game, name) for key, name in self.COMMAND_KEYS.items()}
+        self._handlers = {
+            pygame.QUIT: self._on_quit,
+            pygame.KEYDOWN: self._on_keydown,
+            pygame.KEYUP: self._on_keyup,
+            pygame.MOUSEBUTTONDOWN: self._on_mouse_button_down,
+        }
+        # 窗口被重新显示或重新获得焦点（如切换回全屏游戏）后，屏幕上的内容可能已经被覆盖，需要完整地重绘。
+        for event_type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE, pygame.WINDOWFOCUSGAINED):
+            self._handlers[event_type] = self._on_expose
+        self._bits = 0
+        self._filtering = False
+
+    def _install_filter(self):
+        """让Pygame只把需要的事件放入事件队列。"""
+        # 屏蔽所有事件类型需要遍历SDL的每种事件，耗时数毫秒；无窗口游戏从不处理事件，
+        # 因此推迟到第一次处理事件时才这样做。
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self._handlers))
+        self._filtering = True
+
+    def poll(self):
+        """处理上一帧以来的所有事件，返回这一帧的输入快照。"""
+        if not self._filtering:
+            self._install_filter()
+        handlers = self._handlers
+        for event in pygame.event.get():
+            # 创建Controls之前已在队列中的事件可能不在分派表中。
+            handler = handlers.get(event.type)
+            if handler is not None:
+                handler(event)
+        return _SNAPSHOTS[self._bits]
+
+    def _on_quit(self, event):
+        self.ai_game._quit()
+
+    def _on_keydown(self, event):
+        bit = self._key_bits.get(event.key)
+        if bit is not None:
+            self._bits |= bit
+            return
+        command = self._commands.get(event.key)
+        if command is not None:
+            command()
+
+    def _on_keyup(self, event):
+        self._bits &= ~self._key_bits.get(event.key, 0)
+
+    def _on_expose(self, event):
+        self.ai_game._invalidate_screen()
+
+    def _on_mouse_button_down(self, event):
+        # event.pos是单击时鼠标在显示器上的坐标；缩放显示时先转换为游戏使用的坐标，再传递给_check_play_button()
+        mouse_pos = event.pos
+        viewport = self.ai_game.viewport
+        if viewport is not None:
+            mouse_pos = viewport.to_logical(mouse_pos)
+        self.ai_game._check_play_button(mouse_pos)
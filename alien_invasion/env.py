@@ -0,0 +1,143 @@
+"""以reset()/step(action)接口包装AlienInvasion，用于训练智能体。
+
+动作是一个整数，它的各位与录像中的输入标志（controls.INPUT_BITS）相同：
+1向右、2向左、4向上、8向下、16开火，因此共有32个动作。
+
+观测是一个字典，其中的数组都不复制游戏的数据：
+    obs_type='state'时，包含'ship'（飞船的x、y）、'bullets'（每行一颗子弹的x、y，
+        未使用的行为NaN）以及'alien_x'、'alien_y'、'alien_alive'（外星人群的数组本身）；
+    obs_type='pixels'时，包含'pixels'，即屏幕像素的RGB视图，形状为(高, 宽, 3)。
+观测中的数组在下一次调用step()或reset()时会被改写，需要保留时应自行复制。
+"""
+import copy
+
+import numpy as np
+import pygame
+
+from alien_invasion import AlienInvasion
+from controls import InputState
+from settings import Settings
+
+OBS_TYPES = ('state', 'pixels')
+
+
+class AlienInvasionEnv:
+    """单个游戏的环境。"""
+
+    # 每个动作对应的输入快照。
+    ACTION_INPUTS = tuple(InputState.from_bits(action) for action in range(32))
+
+    def __init__(self, settings=None, obs_type='state', frame_skip=1, max_bullets=64):
+        """创建一个无窗口游戏。
+
+        frame_skip是每个动作持续的帧数；max_bullets是状态观测中最多包含的子弹数。
+        游戏会修改自己的设置（例如外星人群的方向和各级的速度），因此使用settings的副本，
+        同一个settings可以用来创建多个环境。
+        """
+        if obs_type not in OBS_TYPES:
+            raise ValueError(f"obs_type应为{OBS_TYPES}之一，而不是{obs_type!r}")
+        self.obs_type = obs_type
+        self.frame_skip = frame_skip
+        settings = copy.deepcopy(settings) if settings is not None else Settings()
+
+        screen = None
+        if obs_type == 'pixels':
+            # 让游戏直接绘制到一个NumPy数组上，观测只是这个数组的视图。
+            # 与pygame.surfarray.pixels3d()不同，这样的surface不会被锁定，绘制时无需先释放观测。
+            size = (settings.screen_width, settings.screen_height)
+            self._buffer = np.zeros((size[1], size[0], 4), dtype=np.uint8)
+            screen = pygame.image.frombuffer(self._buffer, size, 'RGBX')
+        self.game = AlienInvasion(headless=True, settings=settings, screen=screen)
+
+        if obs_type == 'pixels':
+            self._obs = {'pixels': self._buffer[:, :, :3]}
+        else:
+            self._ship = np.zeros(2)
+            self._bullets = np.full((max_bullets, 2), np.nan)
+            self._obs = {'ship': self._ship, 'bullets': self._bullets}
+        self._score = 0
+
+    @property
+    def action_count(self):
+        """可用动作的个数。"""
+        return len(self.ACTION_INPUTS)
+
+    def reset(self):
+        """开始一局新游戏，返回初始观测。"""
+        self.game.start_game()
+        self._score = self.game.stats.score
+        return self._observe()
+
+    def step(self, action):
+        """执行动作action，返回(观测, 奖励, 是否结束, 信息)。奖励是这段时间内增加的得分。"""
+        game = self.game
+        game.step(self.frame_skip, self.ACTION_INPUTS[action])
+
+        stats = game.stats
+        reward = stats.score - self._score
+        self._score = stats.score
+        info = {'score': stats.score, 'level': stats.level, 'ships_left': stats.ships_left}
+        return self._observe(), reward, not stats.game_active, info
+
+    def _observe(self):
+        """更新观测字典中的数组并返回它。"""
+        game = self.game
+        if self.obs_type == 'pixels':
+            game.screen.fill(game.settings.bg_color)
+            game.draw_elements(return_rects=False)
+            return self._obs
+
+        self._ship[:] = (game.ship.x, game.ship.y)
+        bullets = self._bullets
+        bullets.fill(np.nan)
+        for row, bullet in zip(bullets, game.bullets.sprites()):
+            row[:] = (bullet.rect.x, bullet.y)
+
+        fleet = game.aliens
+        obs = self._obs
+        obs['alien_x'] = fleet.rect_x
+        obs['alien_y'] = fleet.y
+        obs['alien_alive'] = fleet.alive
+        return obs
+
+
+class VectorAlienInvasionEnv:
+    """让多个游戏同步推进的环境，观测、奖励和结束标志都按游戏堆叠成批量数组。
+
+    某个游戏结束时，它会自动开始新的一局，返回的观测是新一局的初始观测，
+    结束时的信息仍在该游戏的info中。
+    """
+
+    def __init__(self, num_envs, **kwargs):
+        """创建num_envs个游戏，kwargs传递给AlienInvasionEnv。"""
+        self.envs = [AlienInvasionEnv(**kwargs) for _ in range(num_envs)]
+        self._batch = None
+        self._rewards = np.zeros(num_envs)
+        self._dones = np.zeros(num_envs, dtype=bool)
+
+    def reset(self):
+        """让所有游戏开始新的一局，返回批量的初始观测。"""
+        for index, env in enumerate(self.envs):
+            self._store(index, env.reset())
+        return self._batch
+
+    def step(self, actions):
+        """让每个游戏执行actions中对应的动作，返回(观测, 奖励, 是否结束, 信息列表)。"""
+        infos = []
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, reward, done, info = env.step(action)
+            if done:
+                obs = env.reset()
+            self._store(index, obs)
+            self._rewards[index] = reward
+            self._dones[index] = done
+            infos.append(info)
+        return self._batch, self._rewards, self._dones, infos
+
+    def _store(self, index, obs):
+        """将一个游戏的观测复制到批量数组中的第index项。"""
+        if self._batch is None:
+            self._batch = {key: np.empty((len(self.envs),) + value.shape, dtype=value.dtype)
+                           for key, value in obs.items()}
+        for key, value in obs.items():
+            self._batch[key][index] = value
@@ -0,0 +1,310 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+from alien import Alien
+from assets import load_image
+from fleet_layer import FleetLayer
+
+
+def _round_rect_coords(values):
+    """像pygame给rect的属性赋小数时那样，将values四舍五入（0.5远离零舍入）为整数。"""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(np.int64)
+
+
+class Formation:
+    """外星人群的队形：每个外星人的初始位置，以及由此导出的行列信息。
+
+    队形创建后不再改变（其中的数组都是只读的），因此可以被反复用来生成外星人群。
+    """
+
+    def __init__(self, xs, ys, width, height):
+        """根据每个外星人左上角的位置xs、ys和外星人的尺寸创建队形。"""
+        self.x = np.array(xs, dtype=float)
+        self.rect_x = _round_rect_coords(self.x)
+        self.y = np.array(ys, dtype=np.int64)
+
+        # 每个外星人所在的列和行（按从左到右、从上到下编号），每列和每行的外星人数，
+        # 以及每列和每行中的一个外星人，用于读取整列或整行的位置。
+        _, self.column_first, self.columns = np.unique(self.x, return_index=True, return_inverse=True)
+        _, self.row_first, self.rows = np.unique(self.y, return_index=True, return_inverse=True)
+        self.column_counts = np.bincount(self.columns, minlength=len(self.column_first))
+        self.row_counts = np.bincount(self.rows, minlength=len(self.row_first))
+
+        # 按行列排列的外星人下标；cell_occupied表示某行某列是否有外星人，没有时cell_index为0。
+        self.cell_index = np.zeros((len(self.row_first), len(self.column_first)), dtype=np.int64)
+        self.cell_occupied = np.zeros(self.cell_index.shape, dtype=bool)
+        self.cell_index[self.rows, self.columns] = np.arange(len(self.x))
+        self.cell_occupied[self.rows, self.columns] = True
+
+        for array in (self.x, self.rect_x, self.y, self.column_first, self.columns,
+                      self.row_first, self.rows, self.column_counts, self.row_counts,
+                      self.cell_index, self.cell_occupied):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self.x)
+
+
+@lru_cache(maxsize=16)
+def fleet_formation(screen_width, screen_height, alien_width, alien_height, ship_height):
+    """返回在给定尺寸的屏幕上排列外星人群的标准队形。
+
+    队形只取决于这些尺寸，因此结果被缓存起来，每次重新创建外星人群时都无需重新计算。
+    """
+    # 计算一行可容纳多少个外星人。
+    # 外星人的间距为外星人宽度。
+    available_space_x = screen_width - (2 * alien_width)
+    number_aliens_x = available_space_x // (2 * alien_width)
+
+    # 计算屏幕可容纳多少行外星人。
+    available_space_y = (screen_height - (3 * alien_height) - ship_height)
+    number_rows = available_space_y // (2 * alien_height)
+
+    # 计算每个外星人的位置（逐行排列）。
+    alien_numbers, row_numbers = np.meshgrid(np.arange(number_aliens_x), np.arange(number_rows))
+    xs = alien_width + 2 * alien_width * alien_numbers.ravel()
+    ys = alien_height + 2 * alien_height * row_numbers.ravel()
+    return Formation(xs, ys, alien_width, alien_height)
+
+
+class Fleet:
+    """用NumPy数组存储整群外星人的类。
+
+    每个外星人不再是一个精灵，而是几个数组中的一项：x存储精确的水平位置，
+    rect_x和y是对应rect的左上角坐标，alive表示外星人是否还存活。这样移动和下移都是
+    一次向量化运算。Fleet提供了与pygame.sprite.Group类似的update()、empty()、
+    sprites()和len()，以及与子弹编组和飞船的碰撞检测。
+
+    外星人群作为一个整体移动：同一列的外星人水平位置始终相同，同一行的外星人纵坐标始终相同，
+    而且各列的左右顺序不会改变。因此Fleet记录每列和每行还有多少个存活的外星人，
+    以及最左、最右的存活列和最下面的存活行，检查边缘和底端只需常数时间。
+    碰撞检测也利用了这一点：用二分查找在各列的x和各行的y中找出与rect重叠的列和行，
+    二者交叉处存活的外星人就是被击中的外星人，因此每颗子弹的开销与外星人的数量无关。
+
+    外星人群总是从一个队形（Formation）生成，生成时只需将队形中的数组复制过来。
+    """
+
+    def __init__(self, ai_game):
+        """初始化一个空的外星人群。"""
+        self.screen_rect = ai_game.screen.get_rect()
+        self.settings = ai_game.settings
+
+        # 所有外星人共享同一幅图像，因此尺寸也相同。
+        self.image = load_image('alien.bmp')
+        self.width, self.height = self.image.get_size()
+
+        self.x = np.empty(0)
+        self.rect_x = np.empty(0, dtype=np.int64)
+        self.y = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self._count = 0
+
+        # 当前外星人群的队形，以及每列和每行的存活外星人数。
+        self.formation = Formation((), (), self.width, self.height)
+        self.column_counts = np.empty(0, dtype=np.int64)
+        self.row_counts = np.empty(0, dtype=np.int64)
+        # 最左、最右的存活列和最下面的存活行。
+        self._left_column = 0
+        self._right_column = -1
+        self._bottom_row = -1
+
+        # 可选的队形渲染器：启用后每帧只绘制一次预先合成的整个队形。
+        # 流水线模式下主线程按快照逐个绘制外星人，不使用图层，因此模拟线程也不必合成它。
+        use_layer = self.settings.fleet_layer and not self.settings.pipelined
+        self.layer = FleetLayer(self) if use_layer else None
+
+    def spawn_formation(self, formation):
+        """按队形formation替换现有的外星人，所有新外星人都是存活的。
+
+        外星人数量不变时（例如在同一屏幕上重新创建外星人群），直接将队形复制到现有的数组中，
+        而不分配新数组。
+        """
+        if len(formation) == len(self.x):
+            self.x[:] = formation.x
+            self.rect_x[:] = formation.rect_x
+            self.y[:] = formation.y
+            self.alive[:] = True
+            self.column_counts[:] = formation.column_counts
+            self.row_counts[:] = formation.row_counts
+        else:
+            self.x = formation.x.copy()
+            self.rect_x = formation.rect_x.copy()
+            self.y = formation.y.copy()
+            self.alive = np.ones(len(formation), dtype=bool)
+            self.column_counts = formation.column_counts.copy()
+            self.row_counts = formation.row_counts.copy()
+        self.formation = formation
+        self._count = len(formation)
+        self._left_column = 0
+        self._right_column = len(formation.column_first) - 1
+        self._bottom_row = len(formation.row_first) - 1
+
+        if self.layer is not None:
+            self.layer.compose()
+
+    def empty(self):
+        """删除所有外星人，但保留数组以便下次创建外星人群时重用。"""
+        self.alive[:] = False
+        self._count = 0
+        self.column_counts[:] = 0
+        self.row_counts[:] = 0
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        return iter(self.sprites())
+
+    def sprites(self):
+        """返回表示存活外星人的Alien精灵列表。这些精灵只是当前位置的副本，修改它们不会影响外星人群。"""
+        aliens = []
+        for x, rect_x, y in zip(self.x[self.alive].tolist(), self.rect_x[self.alive].tolist(),
+                                self.y[self.alive].tolist()):
+            aliens.append(Alien(self, x, pygame.Rect(rect_x, y, self.width, self.height)))
+        return aliens
+
+    def update(self, dt=1.0):
+        """将所有外星人向左或向右移动。dt是经过的时间，以模拟步为单位。"""
+        step = self.settings.alien_speed * self.settings.fleet_direction * dt
+        self.x += step
+        # 写入现有的数组，这样引用rect_x的观测等无需重新获取。
+        np.copyto(self.rect_x, _round_rect_coords(self.x))
+
+    def drop(self, distance):
+        """将所有外星人下移distance像素。"""
+        self.y += distance
+
+    @property
+    def left(self):
+        """存活外星人中最靠左的rect.left。"""
+        return int(self.rect_x[self.formation.column_first[self._left_column]])
+
+    @property
+    def right(self):
+        """存活外星人中最靠右的rect.right。"""
+        return int(self.rect_x[self.formation.column_first[self._right_column]]) + self.width
+
+    @property
+    def bottom(self):
+        """存活外星人中最靠下的rect.bottom。"""
+        return int(self.y[self.formation.row_first[self._bottom_row]]) + self.height
+
+    def check_edges(self):
+        """如果有存活的外星人位于屏幕边缘，就返回True。"""
+        if not self._count:
+            return False
+        return self.right >= self.screen_rect.right or self.left <= 0
+
+    def check_bottom(self):
+        """如果有存活的外星人到达了屏幕底端，就返回True。"""
+        if not self._count:
+            return False
+        return self.bottom >= self.screen_rect.bottom
+
+    def _bands(self):
+        """返回每列外星人的rect.x和每行外星人的rect.y，两个列表都是升序的。
+
+        同一列的外星人rect.x相同，同一行的外星人rect.y相同，因此只需读取每列和每行中的一个外星人。
+        """
+        formation = self.formation
+        return self.rect_x[formation.column_first].tolist(), self.y[formation.row_first].tolist()
+
+    def _alive_cells(self):
+        """返回按行列排列的存活外星人下标的嵌套列表，没有存活外星人的位置为-1。"""
+        formation = self.formation
+        alive = self.alive[formation.cell_index] & formation.cell_occupied
+        return np.where(alive, formation.cell_index, -1).tolist()
+
+    def _overlapping(self, rect, column_x, row_y):
+        """返回与rect重叠的行的范围和列的范围。"""
+        columns = range(bisect_right(column_x, rect.left - self.width), bisect_left(column_x, rect.right))
+        rows = range(bisect_right(row_y, rect.top - self.height), bisect_left(row_y, rect.bottom))
+        return rows, columns
+
+    def collide_rect(self, rect):
+        """返回与rect重叠的存活外星人的下标数组。"""
+        if not self._count:
+            return np.empty(0, dtype=np.int64)
+        rows, columns = self._overlapping(rect, *self._bands())
+        if not rows or not columns:
+            return np.empty(0, dtype=np.int64)
+        alive_cells = self._alive_cells()
+        hit = [alive_cells[row][column] for row in rows for column in columns]
+        return np.array([index for index in hit if index >= 0], dtype=np.int64)
+
+    def kill(self, index):
+        """删除下标为index的外星人，index中的外星人必须是存活的且互不相同。"""
+        self.alive[index] = False
+        self._count -= len(index)
+        if self.layer is not None:
+            self.layer.clear(index)
+        if not self._count:
+            return
+
+        # 更新各列和各行的存活外星人数。如果最外侧的列或最下面的行被清空，就向内收缩。
+        np.subtract.at(self.column_counts, self.formation.columns[index], 1)
+        np.subtract.at(self.row_counts, self.formation.rows[index], 1)
+        while not self.column_counts[self._left_column]:
+            self._left_column += 1
+        while not self.column_counts[self._right_column]:
+            self._right_column -= 1
+        while not self.row_counts[self._bottom_row]:
+            self._bottom_row -= 1
+
+    def groupcollide(self, group, dokilla, dokillb):
+        """与pygame.sprite.groupcollide(group, aliens, dokilla, dokillb)等价。
+
+        返回一个字典，键为发生碰撞的精灵，值为被它击中的外星人的下标数组。
+        """
+        crashed = {}
+        if not self._count:
+            return crashed
+        column_x, row_y = self._bands()
+        # 大多数精灵不与任何一行或任何一列重叠，用不到存活外星人的列表，因此第一次需要时才创建它。
+        alive_cells = None
+        for sprite in group.sprites():
+            rows, columns = self._overlapping(sprite.rect, column_x, row_y)
+            if not rows or not columns:
+                continue
+            if alive_cells is None:
+                alive_cells = self._alive_cells()
+            hit = []
+            for row in rows:
+                row_cells = alive_cells[row]
+                for column in columns:
+                    index = row_cells[column]
+                    if index >= 0:
+                        hit.append(index)
+                        # 与pygame相同，被前面的精灵删除的外星人不会再被后面的精灵击中。
+                        if dokillb:
+                            row_cells[column] = -1
+            if hit:
+                hit = np.array(hit, dtype=np.int64)
+                crashed[sprite] = hit
+                if dokillb:
+                    self.kill(hit)
+        # 遍历结束后再一次性删除发生碰撞的精灵。每个精灵只被检查一次，因此结果与立即删除相同。
+        if dokilla and crashed:
+            group.remove(*crashed)
+        return crashed
+
+    def spritecollideany(self, sprite):
+        """返回与sprite重叠的一个外星人的下标，如果没有就返回None。"""
+        hit = self.collide_rect(sprite.rect)
+        return int(hit[0]) if len(hit) else None
+
+    def blit_sequence(self):
+        """返回绘制所有存活外星人的(图像, 位置)列表，供Surface.blits()使用。"""
+        if not self._count:
+            return []
+        if self.layer is not None:
+            return self.layer.blit_sequence()
+        alive = self.alive
+        image = self.image
+        return [(image, position) for position in zip(self.rect_x[alive].tolist(), self.y[alive].tolist())]
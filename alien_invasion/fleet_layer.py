@@ -0,0 +1,92 @@
+import numpy as np
+import pygame
+
+
+class FleetLayer:
+    """将外星人队形预先绘制到surface上的渲染器。
+
+    外星人群作为一个整体移动，因此可以把队形的每一行预先绘制到一个surface上，
+    每帧只需一次blits()调用绘制各行，而不必逐个绘制外星人。外星人被击落时，
+    只需在它所在行的surface上擦除对应的单元格。每行使用单独的surface并启用RLE加速：
+    擦除单元格后只需重新编码这一行，而不是整个队形。
+
+    每个外星人的位置是单独累加和舍入的，某些列的rect.x可能比其他列多或少1像素。
+    因此绘制时把偏移相同的相邻各列作为一段，每段按自己的偏移绘制，与逐个绘制外星人的结果完全相同。
+    """
+
+    def __init__(self, fleet):
+        """初始化渲染器，fleet是要绘制的外星人群。"""
+        self.fleet = fleet
+        # 外星人图像中透明的颜色，也用作各行surface的透明色。
+        self.colorkey = fleet.image.get_colorkey()
+        self.rows = []
+        # 每个外星人以及每列外星人在所在行surface中的水平位置。
+        self.local_x = None
+        self.column_local_x = None
+        # 完整队形的各行，用于在重新生成外星人群时恢复self.rows，以及它们对应的队形。
+        self._full_rows = []
+        self._formation = None
+
+    def compose(self):
+        """按外星人群当前的队形恢复完整的各行。同一队形的各行只需绘制一次。"""
+        formation = self.fleet.formation
+        if formation is not self._formation:
+            self._prepare(formation)
+        for row, full_row in zip(self.rows, self._full_rows):
+            row.blit(full_row, (0, 0))
+
+    def _prepare(self, formation):
+        """为队形formation绘制完整的各行，并创建同样大小的各行surface。"""
+        fleet = self.fleet
+        self._formation = formation
+        if not len(formation):
+            self.rows = self._full_rows = []
+            return
+
+        self.local_x = formation.rect_x - int(formation.rect_x.min())
+        self.column_local_x = self.local_x[formation.column_first]
+        size = (int(self.local_x.max()) + fleet.width, fleet.height)
+        self._full_rows = [self._new_row(size) for _ in formation.row_first]
+        for row_number, x in zip(formation.rows.tolist(), self.local_x.tolist()):
+            self._full_rows[row_number].blit(fleet.image, (x, 0))
+        self.rows = [self._new_row(size) for _ in formation.row_first]
+
+    def _new_row(self, size):
+        """创建一个填充了透明色的行surface。"""
+        row = pygame.Surface(size).convert()
+        row.fill(self.colorkey)
+        row.set_colorkey(self.colorkey, pygame.RLEACCEL)
+        return row
+
+    def clear(self, index):
+        """擦除下标为index的外星人所在的单元格。"""
+        fleet = self.fleet
+        cell = pygame.Rect(0, 0, fleet.width, fleet.height)
+        for row_number, x in zip(fleet.formation.rows[index].tolist(), self.local_x[index].tolist()):
+            cell.x = x
+            self.rows[row_number].fill(self.colorkey, cell)
+
+    def blit_sequence(self):
+        """返回绘制所有还有存活外星人的行的(图像, 位置[, 区域])列表，供Surface.blits()使用。"""
+        fleet = self.fleet
+        formation = fleet.formation
+        offsets = fleet.rect_x[formation.column_first] - self.column_local_x
+        row_ys = fleet.y[formation.row_first].tolist()
+        rows = [(row, y) for row, y, count in zip(self.rows, row_ys, fleet.row_counts.tolist()) if count]
+
+        # 通常所有列的偏移都相同，每行只需一个命令。
+        breaks = np.flatnonzero(offsets[1:] != offsets[:-1])
+        if not len(breaks):
+            left = int(offsets[0])
+            return [(row, (left, y)) for row, y in rows]
+
+        # 否则每行按偏移分成若干段，每段只绘制这些列在行surface中占据的区域。
+        column_x = self.column_local_x.tolist()
+        offsets = offsets.tolist()
+        starts = [0] + (breaks + 1).tolist()
+        ends = starts[1:] + [len(offsets)]
+        height = fleet.height
+        segments = [(offsets[start] + column_x[start],
+                     pygame.Rect(column_x[start], 0, column_x[end - 1] + fleet.width - column_x[start], height))
+                    for start, end in zip(starts, ends)]
+        return [(row, (left, y), area) for row, y in rows for left, area in segments]
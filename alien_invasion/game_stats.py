@@ -1,20 +1,45 @@
 class GameStats:
     """跟踪游戏的统计信息。"""
+
+    # 游戏的状态：正在进行、飞船被撞后暂停等待重新出发、游戏结束。
+    PLAYING = 'playing'
+    RESPAWNING = 'respawning'
+    GAME_OVER = 'game_over'
+
     def __init__(self, ai_game):
         """初始化统计信息。"""
         self.score = None
         self.ships_left = None
         self.settings = ai_game.settings
-        # 任何情况下都不应重置最高得分。
-        self.high_score = 0
+        # 任何情况下都不应重置最高得分。如果保存了最高得分，就从上次保存的值开始。
+        high_scores = ai_game.high_scores
+        self.high_score = high_scores.high_score if high_scores is not None else 0
 
         # 每当玩家开始新游戏时，需要重置一些统计信息。
         # 为此，在方法reset_stats()中初始化大部分统计信息，而不是在__init__() 中直接初始化。
         # 我们在__init__() 中调用这个方法，这样创建GameStats 实例时将妥善地设置这些统计信息，在玩家开始新游戏时也能调用reset_stats()
         self.reset_stats()
 
-        # 游戏刚启动时处于活动状态。
-        self.game_active = False
+        # 游戏刚启动时处于非活动状态。
+        self.state = GameStats.GAME_OVER
+        # 处于RESPAWNING状态时，还需要经过多少个模拟步才能继续游戏。
+        self.respawn_timer = 0
+
+    @property
+    def game_active(self):
+        """游戏正在进行（包括飞船被撞后的暂停）时返回True。"""
+        return self.state != GameStats.GAME_OVER
+
+    def start_respawn(self):
+        """进入飞船被撞后的暂停，暂停的时长由游戏时钟而不是墙上时间计量。"""
+        self.state = GameStats.RESPAWNING
+        self.respawn_timer = self.settings.respawn_pause * self.settings.sim_rate
+
+    def update_respawn(self, dt):
+        """让暂停经过dt个模拟步，暂停结束后回到PLAYING状态。"""
+        self.respawn_timer -= dt
+        if self.respawn_timer <= 0:
+            self.state = GameStats.PLAYING
 
     def reset_stats(self):
         """初始化在游戏运行期间可能变化的统计信息。"""
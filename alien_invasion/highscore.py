@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import threading
+
+
+class HighScoreStore:
+    """将最高得分保存在JSON文件中的类。
+
+    最高得分在第一次读取时才从磁盘加载。submit()只是记下新的最高得分，由后台线程写入磁盘，
+    因此游戏主循环从不等待磁盘。写入之前提交的多个得分只写入最新的一个，
+    写入时先写临时文件再替换原文件，因此文件不会只写了一半。
+    """
+
+    def __init__(self, path):
+        """初始化存储，path是保存最高得分的文件。"""
+        self.path = path
+        self._high_score = None
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._writer = None
+
+    @property
+    def high_score(self):
+        """保存的最高得分。文件不存在或无法读取时为0。"""
+        if self._high_score is None:
+            try:
+                with open(self.path) as f:
+                    self._high_score = int(json.load(f)['high_score'])
+            except (OSError, ValueError, KeyError, TypeError):
+                self._high_score = 0
+        return self._high_score
+
+    def submit(self, score):
+        """记下新的最高得分，稍后由后台线程写入磁盘。"""
+        self._high_score = score
+        with self._condition:
+            self._pending = score
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_pending, daemon=True)
+                self._writer.start()
+            self._condition.notify()
+
+    def close(self):
+        """写入尚未保存的最高得分，并停止后台线程。"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._writer is not None:
+            self._writer.join()
+
+    def _write_pending(self):
+        """后台线程：等待新的最高得分并将其写入磁盘，直到存储被关闭。"""
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                score, self._pending = self._pending, None
+                if score is None:
+                    return
+            self._write(score)
+
+    def _write(self, score):
+        """将score写入临时文件，再用它替换原文件。"""
+        # 写入失败时放弃这一次写入，但后台线程必须继续运行，以便写入以后提交的得分。
+        directory = os.path.dirname(os.path.abspath(self.path))
+        temp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'high_score': score}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
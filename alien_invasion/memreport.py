@@ -0,0 +1,89 @@
+"""用tracemalloc报告游戏实体和整局无窗口游戏占用的内存。
+
+第一部分是每种实体平均占用的字节数（包括它自己的rect）；第二部分对每种分辨率（决定外星人群的规模）
+创建一局无窗口游戏并运行若干帧，报告游戏创建后占用的内存和运行期间的峰值。
+tracemalloc只统计Python和NumPy分配的内存，不包括SDL为surface分配的像素，
+因此另外列出每局游戏的屏幕surface占用的字节数。
+
+    python memreport.py
+    python memreport.py --count 20000 --frames 1000
+"""
+import argparse
+import sys
+import tracemalloc
+
+import pygame
+
+from alien import Alien
+from alien_invasion import AlienInvasion
+from benchmark import scripted_inputs
+from bullet import Bullet
+from settings import Settings
+from ship import Ship
+
+RESOLUTIONS = ((1200, 800), (1920, 1080), (3840, 2160))
+
+
+def bytes_per_object(create, count):
+    """返回create()创建的每个对象平均占用的字节数。"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [create() for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # 不计存放这些对象的列表本身。
+    return (after - before - sys.getsizeof(objects)) / count
+
+
+def entity_sizes(count):
+    """返回每种实体平均占用的字节数。"""
+    ai_game = AlienInvasion(headless=True)
+    fleet = ai_game.aliens
+    return {
+        'bullet': bytes_per_object(lambda: Bullet(ai_game.bullets), count),
+        'alien': bytes_per_object(lambda: Alien(fleet, 0.0, pygame.Rect(0, 0, fleet.width, fleet.height)), count),
+        'ship': bytes_per_object(lambda: Ship(ai_game), count),
+    }
+
+
+def game_memory(width, height, frames):
+    """创建一局无窗口游戏并运行frames帧，返回外星人数、游戏占用的字节数、峰值和屏幕surface的字节数。"""
+    tracemalloc.start()
+    settings = Settings()
+    settings.screen_width = width
+    settings.screen_height = height
+    ai_game = AlienInvasion(headless=True, settings=settings)
+    ai_game.start_game()
+    created, _ = tracemalloc.get_traced_memory()
+
+    done = 0
+    while done < frames:
+        done += ai_game.step(10, scripted_inputs(done))
+        if not ai_game.stats.game_active:
+            ai_game.start_game()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    screen = ai_game.screen
+    screen_bytes = screen.get_width() * screen.get_height() * screen.get_bytesize()
+    return len(ai_game.aliens), created, peak, screen_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alien Invasion 内存占用报告")
+    parser.add_argument('--count', type=int, default=10000, help="测量每种实体时创建的对象数")
+    parser.add_argument('--frames', type=int, default=500, help="每局游戏运行的帧数")
+    args = parser.parse_args(argv)
+
+    for name, size in entity_sizes(args.count).items():
+        print(f"{name:<10} {size:>8.1f} bytes")
+
+    for width, height in RESOLUTIONS:
+        aliens, created, peak, screen_bytes = game_memory(width, height, args.frames)
+        print(f"{width}x{height:<10} aliens {aliens:>5}  game {created / 1024:>8.1f} KiB  "
+              f"peak {peak / 1024:>8.1f} KiB  screen {screen_bytes / 1024:>8.1f} KiB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""让模拟和绘制在两个线程中同时进行的主循环。
+
+模拟线程按固定的模拟步长推进游戏，每次推进后把飞船、子弹、外星人和记分牌的状态
+复制成一个不可变的快照，放入双缓冲区。主线程处理事件，并绘制缓冲区中最新的快照。
+Pygame在blit和切换屏幕时会释放GIL，因此在高分辨率下，绘制上一帧的同时就能推进下一帧。
+显示器、鼠标光标和事件只在主线程中使用；模拟线程只改变游戏状态，不创建任何surface。
+模拟线程出错时，异常会交给主线程重新抛出。
+"""
+import threading
+from time import perf_counter, sleep
+from typing import NamedTuple
+
+import numpy as np
+import pygame
+
+from renderer import RenderBatch
+from scoreboard import Scoreboard
+
+
+class Snapshot(NamedTuple):
+    """绘制一帧所需的全部游戏状态。字段名与GameStats相同，因此记分牌可以直接读取快照。"""
+    ship_rect: tuple
+    bullet_rects: tuple
+    alien_x: np.ndarray
+    alien_y: np.ndarray
+    score: int
+    high_score: int
+    level: int
+    ships_left: int
+    game_active: bool
+
+
+class SnapshotBuffer:
+    """有两个槽位的快照缓冲区。
+
+    模拟线程把新快照写入后台槽位，再交换前后台；主线程总是读取前台槽位中完整的快照。
+    """
+
+    def __init__(self, snapshot):
+        """用第一个快照填充两个槽位。"""
+        self._slots = [snapshot, snapshot]
+        self._front = 0
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot):
+        """发布一个新快照。"""
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        with self._lock:
+            self._front = back
+
+    def latest(self):
+        """返回最新发布的快照。"""
+        with self._lock:
+            return self._slots[self._front]
+
+
+class StateScoreboard:
+    """模拟线程中代替游戏记分牌的对象：只记录新的最高得分，不合成任何图像。
+
+    HUD由主线程的记分牌按快照合成，因此prep_*()什么也不做。
+    """
+
+    def __init__(self, ai_game):
+        self.ai_game = ai_game
+        self.stats = ai_game.stats
+
+    def prep_score(self):
+        pass
+
+    prep_high_score = prep_level = prep_ships = prep_score
+
+    # 更新最高得分并提交保存，与Scoreboard相同；合成图像的prep_high_score()在这里什么也不做。
+    check_high_score = Scoreboard.check_high_score
+
+
+class Pipeline:
+    """在模拟线程中推进游戏、在主线程中绘制快照的主循环。"""
+
+    def __init__(self, ai_game):
+        """准备模拟线程和绘制快照用的资源。"""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.screen = ai_game.screen
+
+        # 模拟线程推进游戏时持有这个锁；主线程处理事件时也要先获得它，因为开始和退出游戏会改变游戏状态。
+        self.lock = threading.Lock()
+        self.stopping = False
+        # 模拟线程中抛出的异常，由主线程重新抛出。
+        self.error = None
+        # 上一个绘制的快照中游戏是否处于活动状态，用于在状态改变时切换鼠标光标。
+        self.game_active = None
+        # 主线程发布的最新输入快照，模拟线程在每个模拟步之前读取。
+        self.inputs = ai_game.inputs
+
+        update_game = ai_game._update_game
+        if ai_game.recorder is not None:
+            update_game = ai_game._recorded(update_game)
+        self.update_game = update_game
+
+        # 主线程接管游戏的记分牌，按快照中的值合成HUD；游戏（即模拟线程）改用不合成图像的记分牌，
+        # 两个线程不共用任何surface。
+        self.sb = ai_game.sb
+        ai_game.sb = StateScoreboard(ai_game)
+        self.batch = RenderBatch(self.screen)
+        self.buffer = SnapshotBuffer(self._snapshot())
+        self.thread = threading.Thread(target=self._simulate, name='simulation', daemon=True)
+
+    def run(self):
+        """启动模拟线程，并在主线程中处理事件和绘制屏幕。"""
+        ai_game = self.ai_game
+        self.thread.start()
+        while True:
+            ai_game.clock.tick(self.settings.fps_cap)
+            with self.lock:
+                try:
+                    self.inputs = ai_game.controls.poll()
+                except SystemExit:
+                    # 在释放锁之前通知模拟线程停止，以免它在游戏退出后继续推进。
+                    self.stopping = True
+                    raise
+            if self.error is not None:
+                raise self.error
+            self._draw(self.buffer.latest())
+
+    def _simulate(self):
+        """模拟线程：推进游戏，出错时记下异常并停止。"""
+        try:
+            self._simulate_steps()
+        except BaseException as error:
+            self.error = error
+
+    def _simulate_steps(self):
+        """按固定的模拟步长推进游戏，并发布快照。"""
+        ai_game = self.ai_game
+        step = 1 / self.settings.sim_rate
+        max_steps = self.settings.max_steps_per_frame
+        next_step = perf_counter()
+        while True:
+            with self.lock:
+                if self.stopping:
+                    return
+                steps = 0
+                while steps < max_steps and perf_counter() >= next_step:
+                    if ai_game.stats.game_active:
+                        ai_game._apply_inputs(self.inputs)
+                        self.update_game()
+                    next_step += step
+                    steps += 1
+                if steps == max_steps:
+                    # 落后太多时不再追赶，与单线程主循环中的max_steps_per_frame相同。
+                    next_step = max(next_step, perf_counter())
+                if steps:
+                    self.buffer.publish(self._snapshot())
+
+            delay = next_step - perf_counter()
+            if delay > 0:
+                sleep(delay)
+
+    def _snapshot(self):
+        """复制当前的游戏状态。"""
+        ai_game = self.ai_game
+        stats = ai_game.stats
+        aliens = ai_game.aliens
+        alien_x = aliens.rect_x[aliens.alive]
+        alien_y = aliens.y[aliens.alive]
+        alien_x.flags.writeable = False
+        alien_y.flags.writeable = False
+        return Snapshot(
+            ship_rect=tuple(ai_game.ship.rect),
+            bullet_rects=tuple(tuple(bullet.rect) for bullet in ai_game.bullets),
+            alien_x=alien_x,
+            alien_y=alien_y,
+            score=stats.score,
+            high_score=stats.high_score,
+            level=stats.level,
+            ships_left=stats.ships_left,
+            game_active=stats.game_active,
+        )
+
+    def _draw(self, snapshot):
+        """绘制一个快照，并切换到新屏幕。"""
+        ai_game = self.ai_game
+        if snapshot.game_active != self.game_active:
+            # 游戏进行时隐藏鼠标光标，结束后重新显示，以便单击Play按钮。
+            pygame.mouse.set_visible(not snapshot.game_active)
+            self.game_active = snapshot.game_active
+
+        screen = self.screen
+        screen.fill(self.settings.bg_color)
+
+        batch = self.batch
+        batch.add(ai_game.ship.image, snapshot.ship_rect)
+
+        bullet_image = ai_game.bullets.image
+        batch.extend([(bullet_image, rect) for rect in snapshot.bullet_rects])
+
+        alien_image = ai_game.aliens.image
+        batch.extend([(alien_image, position) for position in
+                      zip(snapshot.alien_x.tolist(), snapshot.alien_y.tolist())])
+
+        # 值没有变化的项不会重新合成。
+        sb = self.sb
+        sb.stats = snapshot
+        sb.prep_score()
+        sb.prep_high_score()
+        sb.prep_level()
+        sb.prep_ships()
+        batch.extend(sb.blit_sequence())
+
+        if not snapshot.game_active:
+            batch.add(ai_game.play_button.image, ai_game.play_button.rect)
+
+        batch.submit(return_rects=False)
+        ai_game.present()
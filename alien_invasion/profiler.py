@@ -0,0 +1,115 @@
+import csv
+import json
+from time import perf_counter
+
+import numpy as np
+
+
+class FrameProfiler:
+    """记录主循环每个阶段耗时的分析器。
+
+    每帧各阶段的耗时（毫秒）存储在一个固定大小的环形缓冲区中，因此长时间运行也不会占用更多内存。
+    可以统计每个阶段的p50、p95和p99，在屏幕上显示这些统计信息，并在退出时导出为CSV或JSON。
+    """
+
+    # 主循环的各个阶段；frame是相邻两帧之间经过的总时间，包括等待下一帧的时间。
+    PHASES = ('events', 'ship', 'bullets', 'aliens', 'screen', 'frame')
+    # 每隔多少帧重新渲染一次屏幕上的统计信息。
+    OVERLAY_REFRESH = 30
+
+    def __init__(self, ai_game, size=600):
+        """初始化分析器，size是环形缓冲区能保存的帧数。"""
+        self.ai_game = ai_game
+        self.samples = np.zeros((size, len(self.PHASES)))
+        self.index = 0
+        self.count = 0
+        self._columns = {phase: column for column, phase in enumerate(self.PHASES)}
+        self._current = [0.0] * len(self.PHASES)
+        self._frame_start = perf_counter()
+
+        self.show_overlay = False
+        self._overlay_images = []
+        self._overlay_age = self.OVERLAY_REFRESH
+
+    def record(self, phase, seconds):
+        """将phase阶段耗时seconds秒记入当前帧。一帧中同一阶段可以记录多次，耗时会累加。"""
+        self._current[self._columns[phase]] += seconds * 1000
+
+    def timed(self, phase, func):
+        """返回一个函数，它调用func并将耗时记入phase阶段。"""
+        record = self.record
+
+        def wrapper(*args):
+            start = perf_counter()
+            result = func(*args)
+            record(phase, perf_counter() - start)
+            return result
+        return wrapper
+
+    def end_frame(self):
+        """结束当前帧，将它的各阶段耗时写入环形缓冲区。"""
+        now = perf_counter()
+        current = self._current
+        current[-1] = (now - self._frame_start) * 1000
+        self._frame_start = now
+
+        self.samples[self.index] = current
+        self.index = (self.index + 1) % len(self.samples)
+        self.count = min(self.count + 1, len(self.samples))
+        self._current = [0.0] * len(self.PHASES)
+
+    def recent_samples(self):
+        """按从旧到新的顺序返回缓冲区中的所有帧。"""
+        if self.count < len(self.samples):
+            return self.samples[:self.count]
+        return np.roll(self.samples, -self.index, axis=0)
+
+    def summary(self):
+        """返回每个阶段的统计信息（毫秒），键为阶段名称。"""
+        samples = self.recent_samples()
+        if not len(samples):
+            return {}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99), axis=0)
+        means = samples.mean(axis=0)
+        maxima = samples.max(axis=0)
+        return {phase: {'mean': float(means[column]), 'p50': float(p50[column]),
+                        'p95': float(p95[column]), 'p99': float(p99[column]),
+                        'max': float(maxima[column])}
+                for phase, column in self._columns.items()}
+
+    def export(self, path):
+        """将统计信息导出到path。扩展名为.json时导出统计信息和每帧数据，否则以CSV格式导出每帧数据。"""
+        samples = self.recent_samples()
+        if path.endswith('.json'):
+            data = {'summary': self.summary(),
+                    'frames': {phase: samples[:, column].tolist() for phase, column in self._columns.items()}}
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.PHASES)
+                writer.writerows(samples.tolist())
+
+    def draw_overlay(self, screen):
+        """使用记分牌的字体在屏幕左下角显示各阶段的统计信息，返回被绘制区域的列表。"""
+        self._overlay_age += 1
+        if self._overlay_age >= self.OVERLAY_REFRESH:
+            self._prep_overlay()
+            self._overlay_age = 0
+
+        rects = []
+        bottom = screen.get_rect().bottom - 10
+        for image in reversed(self._overlay_images):
+            rect = image.get_rect(left=10, bottom=bottom)
+            rects.append(screen.blit(image, rect))
+            bottom = rect.top
+        return rects
+
+    def _prep_overlay(self):
+        """将统计信息渲染为图像，每个阶段一行。"""
+        sb = self.ai_game.sb
+        lines = [f"{phase:<8} p50 {stats['p50']:6.2f}  p95 {stats['p95']:6.2f}  p99 {stats['p99']:6.2f} ms"
+                 for phase, stats in self.summary().items()]
+        self._overlay_images = [sb.font.render(line, True, sb.text_color, self.ai_game.settings.bg_color)
+                                for line in lines]
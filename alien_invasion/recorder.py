@@ -0,0 +1,143 @@
+"""记录每个模拟步的输入，并在无窗口模式下以最快速度回放。
+
+录像文件的格式（所有整数均为小端序）：
+
+    b'AIRP'、版本号（1字节）、设置的长度（4字节）、JSON格式的设置和随机数种子
+    若干个(输入标志, 重复次数)记录，各占1字节和2字节
+    结束记录(0xFF, 0)、结果的长度（4字节）、JSON格式的最终得分、等级和模拟步数
+
+输入标志的每一位对应一个按住的键；START位表示在这一步之前开始了一局新游戏。
+连续相同的输入合并为一条记录，因此长时间按住同一组键几乎不占空间。
+"""
+import json
+import random
+import struct
+
+from controls import InputState
+from settings import Settings
+
+MAGIC = b'AIRP'
+VERSION = 1
+
+# 输入标志中每一位的含义见controls.INPUT_BITS；START位紧接在这些位之后。
+START = 32
+
+_RUN = struct.Struct('<BH')
+_LENGTH = struct.Struct('<I')
+_END = 0xFF
+_MAX_RUN = 0xFFFF
+
+
+def _write_json(file, data):
+    payload = json.dumps(data).encode('utf-8')
+    file.write(_LENGTH.pack(len(payload)))
+    file.write(payload)
+
+
+def _read_json(file):
+    (length,) = _LENGTH.unpack(file.read(_LENGTH.size))
+    return json.loads(file.read(length).decode('utf-8'))
+
+
+class InputRecorder:
+    """将游戏每个模拟步的输入写入录像文件的类。"""
+
+    def __init__(self, path, settings, seed=None):
+        """创建录像文件，写入设置并固定随机数种子。"""
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        random.seed(self.seed)
+
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC + bytes([VERSION]))
+        # 以下划线开头的属性（如编译好的等级表）可以由其他设置重新得到，不写入录像。
+        public_settings = {name: value for name, value in vars(settings).items() if not name.startswith('_')}
+        _write_json(self.file, {'settings': public_settings, 'seed': self.seed})
+
+        self.steps = 0
+        self._flags = None
+        self._count = 0
+        self._started = False
+
+    def mark_start(self):
+        """记录在下一个模拟步之前开始了一局新游戏。"""
+        self._started = True
+
+    def record(self, ai_game):
+        """记录即将执行的模拟步的输入。"""
+        flags = ai_game.inputs.bits
+        if self._started:
+            flags |= START
+            self._started = False
+
+        if flags == self._flags and self._count < _MAX_RUN:
+            self._count += 1
+        else:
+            self._flush_run()
+            self._flags = flags
+            self._count = 1
+        self.steps += 1
+
+    def close(self, stats):
+        """写入最后一条记录和最终结果，然后关闭文件。"""
+        self._flush_run()
+        self.file.write(_RUN.pack(_END, 0))
+        _write_json(self.file, {'score': stats.score, 'level': stats.level, 'steps': self.steps})
+        self.file.close()
+
+    def _flush_run(self):
+        if self._count:
+            self.file.write(_RUN.pack(self._flags, self._count))
+
+
+def load_recording(path):
+    """读取录像文件，返回(设置, 随机数种子, 输入记录列表, 最终结果)。
+
+    最终结果是一个字典；如果录像没有正常结束，它就为None。
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}不是录像文件")
+        version = f.read(1)[0]
+        if version != VERSION:
+            raise ValueError(f"不支持的录像版本：{version}")
+        header = _read_json(f)
+
+        runs = []
+        result = None
+        while True:
+            data = f.read(_RUN.size)
+            if len(data) < _RUN.size:
+                break
+            flags, count = _RUN.unpack(data)
+            if flags == _END:
+                result = _read_json(f)
+                break
+            runs.append((flags, count))
+
+    settings = Settings()
+    for name, value in header['settings'].items():
+        # JSON没有元组，颜色等设置需要转换回元组。
+        setattr(settings, name, tuple(value) if isinstance(value, list) else value)
+    return settings, header['seed'], runs, result
+
+
+def replay(path):
+    """在无窗口模式下以最快速度回放录像，返回(游戏, 执行的模拟步数, 录制时的最终结果)。"""
+    # 在这里导入，以免alien_invasion和recorder相互导入。
+    from alien_invasion import AlienInvasion
+
+    settings, seed, runs, result = load_recording(path)
+    random.seed(seed)
+    ai_game = AlienInvasion(headless=True, settings=settings)
+
+    steps = 0
+    for flags, count in runs:
+        inputs = InputState.from_bits(flags)
+        if flags & START:
+            # 每一步之前都开始了一局新游戏，只能逐步回放。
+            for _ in range(count):
+                ai_game.start_game()
+                steps += ai_game.step(1, inputs)
+        else:
+            steps += ai_game.step(count, inputs)
+    return ai_game, steps, result
@@ -0,0 +1,67 @@
+class RenderBatch:
+    """收集一帧中的blit命令，再用一次Surface.blits()批量提交的类。
+
+    每个命令是一个(图像, 位置)元组，位置可以是rect。与逐个调用blit()相比，
+    大量子弹等元素只需一次从Python到C的调用。
+    """
+
+    def __init__(self, surface):
+        """创建一个绘制到surface上的批次。"""
+        self.surface = surface
+        self.commands = []
+
+    def add(self, image, dest):
+        """添加一个blit命令。"""
+        self.commands.append((image, dest))
+
+    def extend(self, commands):
+        """添加多个blit命令。"""
+        self.commands.extend(commands)
+
+    def submit(self, return_rects=True):
+        """按添加的顺序执行所有命令并清空批次。return_rects为True时返回被绘制区域的列表，否则返回None。"""
+        rects = self.surface.blits(self.commands, return_rects)
+        self.commands.clear()
+        return rects
+
+
+class DirtyRenderer:
+    """只重绘和更新屏幕上发生变化区域的渲染器。
+
+    每帧先用背景色擦除上一帧绘制过的区域，再绘制所有游戏元素，
+    最后只将上一帧和这一帧绘制过的区域传给pygame.display.update()，
+    从而避免每帧都填充整个屏幕并调用pygame.display.flip()。
+    """
+
+    def __init__(self, ai_game):
+        """初始化渲染器。"""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        # 上一帧绘制过的区域，下一帧需要先擦除它们。
+        self.last_rects = []
+        # 第一帧屏幕上还什么都没有，需要完整地绘制一次。
+        self.needs_full_redraw = True
+
+    def invalidate(self):
+        """让下一帧完整地重绘整个屏幕。"""
+        self.needs_full_redraw = True
+
+    def update_screen(self):
+        """绘制一帧，并只更新发生变化的区域。"""
+        bg_color = self.settings.bg_color
+        if self.needs_full_redraw:
+            self.screen.fill(bg_color)
+            self.last_rects = self.ai_game.draw_elements()
+            self.ai_game.present()
+            self.needs_full_redraw = False
+            return
+
+        # 擦除上一帧绘制的所有元素。
+        for rect in self.last_rects:
+            self.screen.fill(bg_color, rect)
+
+        rects = self.ai_game.draw_elements()
+        self.ai_game.present(self.last_rects + rects)
+        self.last_rects = rects
@@ -1,11 +1,21 @@
-import pygame.font
-from pygame.sprite import Group
+import pygame
 
-from ship import Ship
+from assets import load_font, load_image
 
 
 class Scoreboard:
-    """显示得分信息的类。"""
+    """显示得分信息的类。
+
+    得分、最高得分、等级和余下的飞船都合成在一个缓存的HUD图像上，每帧只需一次blit。
+    只有某一项的值真正改变时，才重新合成这一项；数字由预先渲染好的字形拼成，不必每次都调用字体渲染。
+    """
+
+    # HUD图像中表示透明的颜色，文本和飞船图像中都不会出现这种颜色。
+    TRANSPARENT = (255, 0, 255)
+
+    # 得分和等级只会用到这些字符。
+    GLYPHS = '0123456789,'
+
     def __init__(self, ai_game):
         """初始化显示得分涉及的属性。"""
         self.ai_game = ai_game
@@ -16,7 +26,27 @@ class Scoreboard:
 
         # 显示得分信息时使用的字体设置。
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = load_font(48)
+
+        # 每个字符只渲染一次，之后的数字都由这些字形拼接而成。
+        self.glyphs = {char: self.font.render(char, True, self.text_color, self.settings.bg_color)
+                       for char in self.GLYPHS}
+        self.ship_image = load_image('ship.bmp')
+
+        # HUD从屏幕顶部开始，高度足以容纳得分下方的等级和左上角的飞船。
+        glyph_height = self.glyphs['0'].get_height()
+        hud_height = max(20 + glyph_height + 10 + glyph_height, 10 + self.ship_image.get_height())
+        # 各项都合成在画布上；每次修改RLE编码的surface都要重新编码，因此绘制前才把画布复制到HUD上，
+        # 一帧中无论改变了多少项，HUD都最多重新编码一次。
+        self._canvas = pygame.Surface((self.screen_rect.width, hud_height)).convert()
+        self._canvas.fill(self.TRANSPARENT)
+        self.hud = self._canvas.copy()
+        self.hud.set_colorkey(self.TRANSPARENT, pygame.RLEACCEL)
+        self._hud_stale = False
+
+        # 每一项上次合成时的值及其在HUD上占据的区域。
+        self._values = {}
+        self._rects = {}
 
         # 准备初始得分图像。
         self.prep_score()
@@ -26,68 +56,108 @@ class Scoreboard:
 
         self.prep_ships()
 
+    def _render_text(self, text):
+        """用字形拼出一串文本的图像。"""
+        glyphs = [self.glyphs[char] for char in text]
+        image = pygame.Surface((sum(glyph.get_width() for glyph in glyphs),
+                                glyphs[0].get_height())).convert()
+        x = 0
+        for glyph in glyphs:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return image
+
+    def _compose(self, part, image, rect):
+        """擦除画布上某一项原来的图像，再把新图像合成上去。"""
+        old_rect = self._rects.get(part)
+        if old_rect is not None:
+            self._canvas.fill(self.TRANSPARENT, old_rect)
+        self._canvas.blit(image, rect)
+        self._rects[part] = rect
+        self._hud_stale = True
+
+    def _unchanged(self, part, value):
+        """这一项的值没有变化时返回True，否则记下新值并返回False。"""
+        if self._values.get(part) == value:
+            return True
+        self._values[part] = value
+        return False
+
     def prep_score(self):
         """将得分转换为一幅渲染的图像。"""
 
         # 函数round() 通常让小数精确到小数点后某一位，其中小数位数是由第二个实参指定的。
         # 然而，如果将第二个实参指定为负数，round() 将舍入到最近的10的整数倍，如10、100、1000等
         rounded_score = round(self.stats.score, -1)
+        if self._unchanged('score', rounded_score):
+            return
 
         # 使用一个字符串格式设置指令，让Python将数值转换为字符串时在其中插入逗号。例如，输出为1,000,000 而不是1000000
         score_str = "{:,}".format(rounded_score)
-
-        # 将这个字符串传递给创建图像的render()。为在屏幕上清晰地显示得分，向render() 传递屏幕背景色和文本颜色。
-        self.score_image = self.font.render(score_str, True, self.text_color, self.settings.bg_color)
+        self.score_image = self._render_text(score_str)
 
         # 将得分放在屏幕右上角，并在得分增大导致数变宽时让其向左延伸。
         # 为确保得分始终锚定在屏幕右边，创建一个名为score_rect的rect，让其右边缘与屏幕右边缘相距20像素，并让其上边缘与屏幕上边缘也相距20像素
         self.score_rect = self.score_image.get_rect()
         self.score_rect.right = self.screen_rect.right - 20
         self.score_rect.top = 20
+        self._compose('score', self.score_image, self.score_rect)
 
     def prep_high_score(self):
         """将最高得分转换为渲染的图像。"""
         high_score = round(self.stats.high_score, -1)
+        if self._unchanged('high_score', high_score):
+            return
         high_score_str = "{:,}".format(high_score)
-        self.high_score_image = self.font.render(high_score_str, True, self.text_color, self.settings.bg_color)
+        self.high_score_image = self._render_text(high_score_str)
         self.high_score_rect = self.high_score_image.get_rect()
 
         # 将最高得分放在屏幕顶部中央。
         self.high_score_rect.centerx = self.screen_rect.centerx
         self.high_score_rect.top = self.score_rect.top
+        self._compose('high_score', self.high_score_image, self.high_score_rect)
 
     def check_high_score(self):
         """检查是否诞生了新的最高得分。"""
         if self.stats.score > self.stats.high_score:
             self.stats.high_score = self.stats.score
-        self.prep_high_score()
-
-    def show_score(self):
-        """在屏幕上显示得分。"""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
+            # 新的最高得分由后台线程保存，这里不会等待磁盘。
+            if self.ai_game.high_scores is not None:
+                self.ai_game.high_scores.submit(self.stats.high_score)
+            self.prep_high_score()
+
+    def blit_sequence(self):
+        """返回绘制HUD的(图像, 位置)列表，供Surface.blits()使用。"""
+        if self._hud_stale:
+            self.hud.blit(self._canvas, (0, 0))
+            self._hud_stale = False
+        return [(self.hud, (0, 0))]
 
     def prep_level(self):
         """将等级转换为渲染的图像。"""
         # prep_level() 根据存储在stats.level 中的值创建一幅图像
+        if self._unchanged('level', self.stats.level):
+            return
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(level_str, True, self.text_color, self.settings.bg_color)
+        self.level_image = self._render_text(level_str)
 
         # 将其right 属性设置为得分的right 属性。然后，将top属性设置为比得分图像的bottom属性大10像素，以便在得分和等级之间留出一定的空间
         self.level_rect = self.level_image.get_rect()
 
         self.level_rect.right = self.score_rect.right
         self.level_rect.top = self.score_rect.bottom + 10
+        self._compose('level', self.level_image, self.level_rect)
 
     def prep_ships(self):
         """显示还余下多少艘飞船。"""
+        if self._unchanged('ships', self.stats.ships_left):
+            return
 
-        # 创建一个空编组self.ships ，用于存储飞船实例
-        self.ships = Group()
+        # 所有飞船共用同一幅图像，依次绘制在左上角，飞船图像中透明的部分在HUD上同样透明。
+        ship_width, ship_height = self.ship_image.get_size()
+        self.ships_image = pygame.Surface((ship_width * self.stats.ships_left, ship_height)).convert()
+        self.ships_image.fill(self.TRANSPARENT)
         for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
-            ship.rect.x = 10 + ship_number * ship.rect.width
-            ship.rect.y = 10
-            self.ships.add(ship)
+            self.ships_image.blit(self.ship_image, (ship_number * ship_width, 0))
+        self.ships_rect = self.ships_image.get_rect(topleft=(10, 10))
+        self._compose('ships', self.ships_image, self.ships_rect)
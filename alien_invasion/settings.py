@@ -1,6 +1,25 @@
+import json
+import os
+from typing import NamedTuple
+
+
+class Level(NamedTuple):
+    """某一等级的速度、外星人分数和允许的子弹数。"""
+    ship_speed: float
+    bullet_speed: float
+    alien_speed: float
+    alien_points: int
+    bullets_allowed: int
+
+
 class Settings:
     """存储游戏《外星人入侵》中所有设置的类"""
 
+    # 等级进度文件中可以包含的设置。
+    SCHEDULE_SETTINGS = ('initial_ship_speed', 'initial_bullet_speed', 'initial_alien_speed',
+                         'initial_alien_points', 'initial_bullets_allowed', 'speedup_scale',
+                         'score_scale', 'bullets_per_level', 'level_count')
+
     def __init__(self):
         """初始化游戏的设置。"""
 
@@ -10,8 +29,43 @@ class Settings:
         self.screen_height = 800
         self.bg_color = (230, 230, 230)
 
+        # 帧率设置。所有速度的单位都是“像素/模拟步”，每秒执行sim_rate个模拟步，因此游戏速度与机器快慢无关。
+        # fps_cap限制每秒绘制的帧数（0表示不限制），让主循环在帧之间休眠而不是占满一个CPU核心。
+        self.sim_rate = 240
+        self.fps_cap = 60
+        # 为True时按固定的模拟步长累积推进，让物理过程是确定性的；为False时按实际经过的时间推进。
+        self.fixed_timestep = True
+        # 每帧最多推进的模拟步数，避免机器卡顿后为了追赶时间而越来越慢。
+        self.max_steps_per_frame = 10
+
+        # 为True时按screen_width和screen_height绘制到内部surface上，每帧缩放一次到全屏显示器，
+        # 而不是按显示器的原生分辨率绘制；这样高分辨率显示器上绘制的像素更少，外星人群的布局也与显示器无关。
+        # smooth_scaling为True时使用更平滑但更慢的缩放。
+        self.scale_to_display = False
+        self.smooth_scaling = False
+
+        # 为True时在单独的线程中推进游戏，主线程只处理事件并绘制模拟线程发布的快照，
+        # 总是按固定的模拟步长推进。此时不使用分析器、脏矩形渲染和外星人群的预绘制图层。
+        self.pipelined = False
+
+        # 为True时记录主循环每个阶段的耗时，按F3显示统计信息。
+        # profile_export不为None时，退出游戏时将统计信息导出到这个文件（.csv或.json）。
+        self.profiling = False
+        self.profile_export = None
+
+        # 为True时将整个外星人队形预先绘制到一个surface上，每帧只绘制一次。
+        self.fleet_layer = False
+
+        # 为True时只重绘并更新屏幕上发生变化的区域，而不是每帧都填充并切换整个屏幕。
+        self.dirty_rendering = False
+
+        # 保存最高得分的文件，为None时不保存。无窗口模式下从不保存最高得分。
+        self.high_score_path = os.path.join(os.path.expanduser('~'), '.alien_invasion_high_score.json')
+
         # 飞船设置
         self.ship_limit = 3
+        # 飞船被撞后暂停多少秒（游戏时间）再继续。
+        self.respawn_pause = 0.5
         self.ship_speed = None
 
         # 子弹设置
@@ -19,7 +73,7 @@ class Settings:
         self.bullet_width = 3
         self.bullet_height = 15
         self.bullet_color = (60, 60, 60)
-        self.bullets_allowed = 3
+        self.bullets_allowed = None
 
         # 设置fleet_drop_speed 指定有外星人撞到屏幕边缘时，外星人群向下移动的速度。
         self.alien_speed = None
@@ -35,24 +89,76 @@ class Settings:
         # 外星人分数的提高速度。
         self.score_scale = 1.5
 
+        # 等级进度：第1级的速度、分数和子弹数，以后每升一级，速度乘以speedup_scale，
+        # 分数乘以score_scale并取整，子弹数增加bullets_per_level。
+        # 每局开始时这些设置被编译成一张表，此后进入任何等级都只需查表。
+        self.initial_ship_speed = 1.5
+        self.initial_bullet_speed = 3.0
+        self.initial_alien_speed = 1.0
+        self.initial_alien_points = 50
+        self.initial_bullets_allowed = 3
+        self.bullets_per_level = 1
+        # 表中的等级数；超过最高等级后不再加快。
+        self.level_count = 100
+        # 个别等级的例外取值，键为等级，值为Level中的字段及其取值，只影响这一级。
+        self.level_overrides = {}
+        self._levels = None
+
         # 调用initialize_dynamic_settings() 初始化随游戏进行而变化的属性
         self.initialize_dynamic_settings()
 
     def initialize_dynamic_settings(self):
         """初始化随游戏进行而变化的设置。"""
-        self.ship_speed = 1.5
-        self.bullet_speed = 3.0
-        self.alien_speed = 1.0
         # fleet_direction为1表示向右，为-1表示向左。
         self.fleet_direction = 1
 
-        # 记分
-        self.alien_points = 50
+        # 按当前的等级进度设置重新编译等级表，再使用第1级的速度、分数和子弹数。
+        self.compile_levels()
+        self.apply_level(1)
+
+    def load_level_schedule(self, path):
+        """从JSON文件中读取等级进度。
+
+        文件是一个对象，可以包含initial_ship_speed、speedup_scale、bullets_per_level等等级进度设置，
+        以及levels：键为等级，值为这一级的例外取值，如 {"5": {"alien_speed": 3.0}}。
+        """
+        with open(path, encoding='utf-8') as f:
+            schedule = json.load(f)
+        overrides = schedule.pop('levels', {})
+        for name, value in schedule.items():
+            if name not in self.SCHEDULE_SETTINGS:
+                raise ValueError(f"未知的等级进度设置：{name}")
+            setattr(self, name, value)
+        self.level_overrides = {int(level): values for level, values in overrides.items()}
+        self.compile_levels()
+
+    def compile_levels(self):
+        """根据等级进度设置计算每一级的取值。
 
-    def increase_speed(self):
-        """提高速度设置"""
-        self.ship_speed *= self.speedup_scale
-        self.bullet_speed *= self.speedup_scale
-        self.alien_speed *= self.speedup_scale
+        速度直接由第1级的速度乘以speedup_scale的幂得到，不会因逐级相乘而累积误差；
+        分数仍像原来那样逐级乘以score_scale并取整。
+        """
+        levels = []
+        alien_points = self.initial_alien_points
+        for level in range(1, self.level_count + 1):
+            speedup = self.speedup_scale ** (level - 1)
+            row = Level(ship_speed=self.initial_ship_speed * speedup,
+                        bullet_speed=self.initial_bullet_speed * speedup,
+                        alien_speed=self.initial_alien_speed * speedup,
+                        alien_points=alien_points,
+                        bullets_allowed=self.initial_bullets_allowed + self.bullets_per_level * (level - 1))
+            overrides = self.level_overrides.get(level) or self.level_overrides.get(str(level))
+            if overrides:
+                row = row._replace(**overrides)
+            levels.append(row)
+            alien_points = int(alien_points * self.score_scale)
+        self._levels = levels
 
-        self.alien_points = int(self.alien_points * self.score_scale)
+    def apply_level(self, level):
+        """使用第level级的速度、分数和子弹数。等级从1开始，超过最高等级时使用最高等级。"""
+        if level < 1:
+            raise ValueError(f"等级必须从1开始：{level}")
+        if self._levels is None:
+            self.compile_levels()
+        row = self._levels[min(level, len(self._levels)) - 1]
+        self.ship_speed, self.bullet_speed, self.alien_speed, self.alien_points, self.bullets_allowed = row
@@ -1,25 +1,25 @@
-import pygame
-from pygame.sprite import Sprite
+from assets import load_image
 
 
-class Ship(Sprite):
+class Ship:
     """管理飞船的类"""
-    # __init__() 接受两个参数：引用self 和指向当前AlienInvasion 实例的引用。
+    # 使用__slots__而不是每个实例的__dict__，飞船只有这些属性。
+    # 子弹和外星人通过对象池和外星人群共享settings等引用；每局游戏只有一艘飞船，没有可以共享这些引用的对象，
+    # 而一个进程中的多局无窗口游戏可能使用不同的设置和屏幕，因此它们也不能放在类中。image指向资源缓存中共享的surface。
+    __slots__ = ('settings', 'screen_rect', 'image', 'rect', 'x', 'y',
+                 'moving_right', 'moving_left', 'moving_up', 'moving_down')
 
+    # __init__() 接受两个参数：引用self 和指向当前AlienInvasion 实例的引用。
     def __init__(self, ai_game):
         """初始化飞船并设置其初始位置。"""
 
-        super().__init__()
-
-        # 将屏幕赋给了Ship的一个属性，以便在这个类的所有方法中轻松访问
-        self.screen = ai_game.screen
         self.settings = ai_game.settings
 
         # 使用方法get_rect()访问屏幕的属性rect，并将其赋给了self.screen_rect，从而获取到屏幕的位置
         self.screen_rect = ai_game.screen.get_rect()
 
-        # 调用pygame.image.load() 加载图像该函数返回一个表示飞船的surface, 而我们将这个surface赋给了self.image
-        self.image = pygame.image.load('images/ship.bmp')
+        # 调用load_image() 获取表示飞船的surface，图像只从磁盘加载一次，所有飞船（包括记分牌中的）共享这个surface
+        self.image = load_image('ship.bmp')
 
         # 加载图像后，使用get_rect()获取相应surface的属性rect，以便后面能够使用它来指定飞船的位置。
         # 之后的代码中self.rect代表的就是飞船的位置
@@ -43,27 +43,24 @@ class Ship(Sprite):
         self.moving_up = False
         self.moving_down = False
 
-    def update(self):
-        """根据移动标志调整飞船的位置"""
+    def update(self, dt=1.0):
+        """根据移动标志调整飞船的位置。dt是经过的时间，以模拟步为单位。"""
+        distance = self.settings.ship_speed * dt
 
         # 更新飞船而不是rect对象的x值。
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += distance
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= distance
         if self.moving_up and self.rect.top > 0:
-            self.y -= self.settings.ship_speed
+            self.y -= distance
         if self.moving_down and self.rect.bottom < self.screen_rect.bottom:
-            self.y += self.settings.ship_speed
+            self.y += distance
 
         # 根据self.x更新rect对象，即更新飞船的位置。
         self.rect.x = self.x
         self.rect.y = self.y
 
-    def draw_ship(self):
-        """在指定位置绘制飞船。"""
-        self.screen.blit(self.image, self.rect)
-
     def center_ship(self):
         """让飞船在屏幕底端居中。"""
         # 让飞船在屏幕底端居中后，重置用于跟踪飞船确切位置的属性self.x 。
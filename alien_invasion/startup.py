@@ -0,0 +1,62 @@
+"""测量无窗口游戏的冷启动耗时。
+
+每次启动都在一个新的Python进程中进行，因此模块导入和Pygame初始化都与批量运行时一样从头开始。
+输出每个阶段耗时的中位数和最大值：导入模块、AlienInvasion.__init__中的各个阶段
+（见AlienInvasion.startup_timings）以及绘制第一帧。
+
+    python startup.py --runs 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+
+def measure_startup():
+    """在当前进程中导入游戏、创建一局无窗口游戏并绘制第一帧，返回每个阶段所用的秒数。"""
+    start = perf_counter()
+    from alien_invasion import AlienInvasion
+    imported = perf_counter()
+    ai_game = AlienInvasion(headless=True)
+    created = perf_counter()
+    ai_game._update_screen()
+    drawn = perf_counter()
+
+    timings = {'import': imported - start}
+    timings.update(ai_game.startup_timings)
+    timings['first_frame'] = drawn - created
+    timings['total'] = drawn - start
+    return timings
+
+
+def run_child():
+    """在一个新进程中测量一次启动，返回各阶段所用的秒数。"""
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                            capture_output=True, text=True, env=env, check=True)
+    # 最后一行是测量结果，之前可能有Pygame输出的提示。
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alien Invasion 冷启动耗时")
+    parser.add_argument('--runs', type=int, default=10, help="启动的次数")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_startup()))
+        return 0
+
+    runs = [run_child() for _ in range(args.runs)]
+    for phase in runs[0]:
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<12} median {statistics.median(values):>7.1f} ms  max {max(values):>7.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""在进程池中批量运行无窗口游戏，用于调整Settings中的参数。
+
+每组参数取值的组合都用同一组随机数种子各玩若干局，每局游戏在一个工作进程中运行，
+结果（达到的等级、得分和存活的帧数）汇总为一张CSV表格。
+
+    python sweep.py --param speedup_scale=1.05,1.1,1.2 --param initial_bullets_allowed=3,5 \\
+        --games 8 --policy random --output sweep.csv
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from settings import Settings
+
+# 可以调整的参数及其类型。
+PARAMETERS = {
+    'speedup_scale': float,
+    'score_scale': float,
+    'initial_alien_speed': float,
+    'initial_bullets_allowed': int,
+    'fleet_drop_speed': int,
+}
+POLICIES = ('scripted', 'random')
+RESULT_FIELDS = ('policy', 'seed', 'level', 'score', 'frames')
+
+
+def random_inputs(rng):
+    """随机选择一组输入，移动方向各自随机，大多数时候开火。"""
+    moving_right = rng.random() < 0.5
+    return {'fire': rng.random() < 0.8, 'moving_right': moving_right, 'moving_left': not moving_right}
+
+
+def play_game(job):
+    """在当前进程中玩一局无窗口游戏，返回结果表格中的一行。"""
+    # 在工作进程中才导入，以免主进程初始化Pygame。
+    from alien_invasion import AlienInvasion
+    from benchmark import scripted_inputs
+
+    params, policy, seed, max_frames, (width, height) = job
+    settings = Settings()
+    settings.screen_width = width
+    settings.screen_height = height
+    # 开始游戏时会按这些设置重新编译等级表，因此所有等级都使用新的参数。
+    for name, value in params.items():
+        setattr(settings, name, value)
+    ai_game = AlienInvasion(headless=True, settings=settings)
+    ai_game.start_game()
+
+    rng = random.Random(seed)
+    frames = 0
+    while frames < max_frames and ai_game.stats.game_active:
+        # 每隔10帧重新选择一次输入。
+        inputs = scripted_inputs(frames) if policy == 'scripted' else random_inputs(rng)
+        frames += ai_game.step(min(10, max_frames - frames), inputs)
+
+    row = dict(params)
+    row.update(policy=policy, seed=seed, level=ai_game.stats.level,
+               score=ai_game.stats.score, frames=frames)
+    return row
+
+
+def make_jobs(grid, games, policy, max_frames, screen_size):
+    """为参数网格中的每个组合生成games局游戏。"""
+    names = list(grid)
+    for values in product(*(grid[name] for name in names)):
+        for seed in range(games):
+            yield dict(zip(names, values)), policy, seed, max_frames, screen_size
+
+
+def parse_param(text):
+    """将'name=v1,v2'解析为(name, [v1, v2])。"""
+    name, _, values = text.partition('=')
+    if name not in PARAMETERS or not values:
+        raise argparse.ArgumentTypeError(f"参数应为 name=v1,v2,...，name是{', '.join(PARAMETERS)}之一")
+    return name, [PARAMETERS[name](value) for value in values.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alien Invasion 设置参数批量扫描")
+    parser.add_argument('--param', type=parse_param, action='append', default=[],
+                        help="要扫描的参数及其取值，例如 speedup_scale=1.05,1.1；可以多次指定")
+    parser.add_argument('--games', type=int, default=4, help="每组参数玩多少局")
+    parser.add_argument('--policy', choices=POLICIES, default='scripted', help="输入策略")
+    parser.add_argument('--max-frames', type=int, default=20000, help="每局最多推进的帧数")
+    parser.add_argument('--screen', default='1200x800', help="屏幕尺寸，决定外星人群的规模")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="工作进程数")
+    parser.add_argument('--output', help="将结果写入这个CSV文件，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    grid = dict(args.param)
+    screen_size = tuple(int(n) for n in args.screen.split('x'))
+    jobs = list(make_jobs(grid, args.games, args.policy, args.max_frames, screen_size))
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        rows = list(executor.map(play_game, jobs, chunksize=1))
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(output, fieldnames=list(grid) + list(RESULT_FIELDS))
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import pygame
+
+
+class Viewport:
+    """以固定的内部分辨率绘制，每帧只缩放一次到显示器的类。
+
+    所有游戏元素都绘制到surface上，它的尺寸就是游戏逻辑使用的屏幕尺寸。
+    present()将它按比例缩放到显示器中央最大的区域，两侧或上下留下黑边，然后切换屏幕。
+    """
+
+    def __init__(self, display, size, smooth=False):
+        """为显示器display创建尺寸为size的内部surface。smooth为True时使用较慢但更平滑的缩放。"""
+        self.display = display
+        self.surface = pygame.Surface(size).convert()
+        self.smooth = smooth
+
+        # 保持宽高比的缩放目标区域。
+        display_rect = display.get_rect()
+        scale = min(display_rect.width / size[0], display_rect.height / size[1])
+        self.rect = pygame.Rect(0, 0, round(size[0] * scale), round(size[1] * scale))
+        self.rect.center = display_rect.center
+        self._target = display.subsurface(self.rect)
+
+        # 黑边只需绘制一次，此后缩放只覆盖目标区域。
+        display.fill((0, 0, 0))
+
+    def present(self):
+        """将内部surface缩放到显示器上并切换屏幕。"""
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, self.rect.size, self._target)
+        else:
+            pygame.transform.scale(self.surface, self.rect.size, self._target)
+        pygame.display.flip()
+
+    def to_logical(self, pos):
+        """将显示器上的坐标（如鼠标位置）转换为内部surface上的坐标。"""
+        width, height = self.surface.get_size()
+        return ((pos[0] - self.rect.x) * width // self.rect.width,
+                (pos[1] - self.rect.y) * height // self.rect.height)